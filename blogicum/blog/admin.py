@@ -39,6 +39,7 @@ class PostAdmin(admin.ModelAdmin):
         'location',
         'category',
         'text',
+        'comment_count',
     )
     list_editable = (
         'is_published',
@@ -50,16 +51,23 @@ class PostAdmin(admin.ModelAdmin):
         'is_published',
         'category',
         'location',
+        'image_status',
     )
-    search_fields = (
-        'text',
-        'author',
-    )
+    search_fields = ('author__username',)
     list_display_links = (
         'author',
         'text',
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        """Ищет по автору, а по заголовку и тексту — через индекс FTS5."""
+        found, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        if search_term:
+            found |= queryset.matching(search_term)
+        return found, may_have_duplicates
+
 
 admin.site.register(Location)
 admin.site.register(Comment)
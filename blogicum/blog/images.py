@@ -0,0 +1,325 @@
+import logging
+from base64 import b64encode
+from functools import lru_cache
+from hashlib import sha256
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.signing import Signer
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare
+from PIL import Image, ImageOps
+
+from core.filecache import DiskCache
+from core.workers import BoundedExecutor, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Карточка и пост шириной 40rem на обычном экране и на retina.
+IMAGE_WIDTHS_DEFAULTS = {
+    'card': 640,
+    'detail': 960,
+    'retina': 1280,
+}
+IMAGE_PROCESSING_DEFAULTS = {
+    'ASYNC': True,
+    'WORKERS': 2,
+    'MAX_QUEUE': 32,
+}
+IMAGE_RESIZE_DEFAULTS = {
+    'CACHE_DIR': None,
+    'MAX_CACHE_SIZE': 512 * 1024 * 1024,
+    'MAX_WIDTH': 2560,
+    'MAX_AGE': 365 * 24 * 60 * 60,
+}
+RESIZE_FORMATS = {
+    'jpeg': 'JPEG',
+    'webp': 'WEBP',
+}
+RESIZE_SALT = 'blog.images.resize'
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_QUALITY = 40
+KEPT_FORMATS = {
+    '.jpg': 'JPEG',
+    '.jpeg': 'JPEG',
+    '.png': 'PNG',
+    '.webp': 'WEBP',
+}
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 82, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 80, 'method': 6},
+}
+
+
+def image_widths():
+    return {
+        **IMAGE_WIDTHS_DEFAULTS,
+        **getattr(settings, 'POST_IMAGE_WIDTHS', {}),
+    }
+
+
+def image_processing_settings():
+    return {
+        **IMAGE_PROCESSING_DEFAULTS,
+        **getattr(settings, 'IMAGE_PROCESSING', {}),
+    }
+
+
+def _make_pool():
+    config = image_processing_settings()
+    return BoundedExecutor(
+        'images', config['WORKERS'], config['MAX_QUEUE']
+    )
+
+
+image_pool = _make_pool()
+resize_flight = SingleFlight()
+rendition_flight = SingleFlight()
+
+
+def resize_settings():
+    config = {
+        **IMAGE_RESIZE_DEFAULTS,
+        **getattr(settings, 'IMAGE_RESIZE', {}),
+    }
+    if config['CACHE_DIR'] is None:
+        config['CACHE_DIR'] = settings.BASE_DIR / 'image_cache'
+    return config
+
+
+def rendition_name(name, width):
+    """Имя уменьшенной копии: post_images/640w/photo.jpg.
+
+    Копии лежат в подкаталоге рядом с оригиналом, поэтому не пересекаются
+    с загруженными файлами. Остальные форматы (GIF, BMP, TIFF) сохраняются
+    в JPEG. Копии записываются через default_storage под своими именами:
+    хранилище оригиналов может называть файлы по содержимому.
+    """
+    path = PurePosixPath(name)
+    filename = path.name
+    if path.suffix.lower() not in KEPT_FORMATS:
+        filename += '.jpg'
+    return str(path.parent / f'{width}w' / filename)
+
+
+def rendition_names(name):
+    return {
+        width: rendition_name(name, width)
+        for width in sorted(set(image_widths().values()), reverse=True)
+    }
+
+
+def missing_renditions(image):
+    return [
+        name for name in rendition_names(image.name).values()
+        if not default_storage.exists(name)
+    ]
+
+
+def rendition_format(name):
+    return KEPT_FORMATS.get(PurePosixPath(name).suffix.lower(), 'JPEG')
+
+
+def rendition_url(image, size):
+    return default_storage.url(
+        rendition_name(image.name, image_widths()[size])
+    )
+
+
+def srcset(image, original_width=None):
+    """Значение srcset из уменьшенных копий.
+
+    Копии шире оригинала совпадают с ним по размеру, поэтому из них
+    в список попадает одна, с настоящей шириной оригинала.
+    """
+    entries = []
+    for width in sorted(set(image_widths().values())):
+        if original_width and width >= original_width:
+            entries.append((width, original_width))
+            break
+        entries.append((width, width))
+    return ', '.join(
+        f'{default_storage.url(rendition_name(image.name, width))} {actual}w'
+        for width, actual in entries
+    )
+
+
+def _prepare(source, image_format):
+    if source.mode in ('P', 'PA', 'LA') or 'transparency' in source.info:
+        source = source.convert('RGBA')
+    if image_format == 'JPEG' and source.mode not in ('RGB', 'L'):
+        if source.mode == 'RGBA':
+            background = Image.new('RGB', source.size, 'white')
+            background.paste(source, mask=source.getchannel('A'))
+            return background
+        return source.convert('RGB')
+    if source.mode not in ('RGB', 'RGBA', 'L'):
+        return source.convert('RGBA')
+    return source
+
+
+def _scale(source, width):
+    if source.width <= width:
+        return source
+    return source.resize(
+        (width, round(source.height * width / source.width)),
+        Image.Resampling.LANCZOS,
+    )
+
+
+def _encode(image, image_format, icc_profile):
+    # Метаданные оригинала (EXIF, XMP, текстовые блоки PNG) не переносятся;
+    # цветовой профиль оставляем, иначе на широком охвате цвета поплывут.
+    image.info = {}
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        image_format,
+        icc_profile=icc_profile,
+        **SAVE_OPTIONS[image_format],
+    )
+    return buffer.getvalue()
+
+
+def make_renditions(image, force=False):
+    """Сохраняет уменьшенные копии изображения во всех ширинах.
+
+    Ориентация из EXIF применяется к пикселям, метаданные удаляются.
+    Изображения не увеличиваются: копия для ширины больше оригинала
+    совпадает с ним по размеру. Уже существующие копии пропускаются,
+    если не передан force. Возвращает имена записанных файлов.
+    """
+    storage = default_storage
+    targets = rendition_names(image.name)
+    if not force:
+        targets = {
+            width: name for width, name in targets.items()
+            if not storage.exists(name)
+        }
+    if not targets:
+        return []
+    image_format = rendition_format(image.name)
+    written = []
+    try:
+        with image.storage.open(image.name, 'rb') as file, \
+                Image.open(file) as source:
+            # Для JPEG декодер сразу уменьшает картинку кратно 2, 4 или 8.
+            largest = max(targets)
+            source.draft(source.mode, (largest, largest))
+            icc_profile = source.info.get('icc_profile')
+            source = _prepare(ImageOps.exif_transpose(source), image_format)
+            for width, name in targets.items():
+                content = _encode(
+                    _scale(source, width).copy(), image_format, icc_profile
+                )
+                if storage.exists(name):
+                    storage.delete(name)
+                written.append(storage.save(name, ContentFile(content)))
+    except (OSError, ValueError, Image.DecompressionBombError):
+        logger.exception('Не удалось уменьшить изображение %s', image.name)
+    return written
+
+
+def make_placeholder(image):
+    """Крошечная копия изображения в виде data URI.
+
+    Занимает пару сотен байт, поэтому встраивается прямо в HTML карточки;
+    растянутая браузером, она выглядит размытым превью, пока загружается
+    само изображение.
+    """
+    try:
+        with image.storage.open(image.name, 'rb') as file, \
+                Image.open(file) as source:
+            source.draft(source.mode, (PLACEHOLDER_WIDTH, PLACEHOLDER_WIDTH))
+            source = _prepare(ImageOps.exif_transpose(source), 'WEBP')
+            placeholder = _scale(source, PLACEHOLDER_WIDTH).copy()
+            placeholder.info = {}
+            buffer = BytesIO()
+            placeholder.save(buffer, 'WEBP', quality=PLACEHOLDER_QUALITY)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        logger.exception('Не удалось создать превью для %s', image.name)
+        return ''
+    return 'data:image/webp;base64,' + b64encode(buffer.getvalue()).decode()
+
+
+def resize(name, width, image_format, storage=default_storage):
+    """Возвращает изображение из хранилища, уменьшенное до ширины width."""
+    with storage.open(name, 'rb') as file, Image.open(file) as source:
+        source.draft(source.mode, (width, width))
+        icc_profile = source.info.get('icc_profile')
+        source = _prepare(ImageOps.exif_transpose(source), image_format)
+        return _encode(_scale(source, width).copy(), image_format, icc_profile)
+
+
+def resize_signature(name, width, fmt):
+    return Signer(salt=RESIZE_SALT).signature(f'{name}:{width}:{fmt}')
+
+
+def check_resize_signature(signature, name, width, fmt):
+    return constant_time_compare(
+        signature, resize_signature(name, width, fmt)
+    )
+
+
+def resized_url(image, width, fmt='webp'):
+    """Подписанный URL изображения в произвольной ширине и формате."""
+    return reverse('blog:resized_image', kwargs={
+        'signature': resize_signature(image.name, width, fmt),
+        'width': width,
+        'fmt': fmt,
+        'name': image.name,
+    })
+
+
+@lru_cache(maxsize=None)
+def _get_resize_cache(directory, max_size):
+    return DiskCache(directory, max_size)
+
+
+def get_resize_cache():
+    config = resize_settings()
+    return _get_resize_cache(
+        str(config['CACHE_DIR']), config['MAX_CACHE_SIZE']
+    )
+
+
+def _resize_to_cache(cache, key, suffix, name, width, fmt):
+    # Пока ждали блокировку, файл мог записать предыдущий вызов.
+    path = cache.get(key, suffix)
+    if path is None:
+        path = cache.set(key, resize(name, width, RESIZE_FORMATS[fmt]), suffix)
+    return path
+
+
+def resized_path(name, width, fmt):
+    """Путь к уменьшенному изображению в дисковом кэше.
+
+    Если варианта нет в кэше, он создаётся; одновременные запросы одного
+    варианта в процессе ждут одного уменьшения.
+    """
+    width = min(width, resize_settings()['MAX_WIDTH'])
+    key = sha256(f'{name}:{width}:{fmt}'.encode()).hexdigest()
+    suffix = f'.{fmt}'
+    cache = get_resize_cache()
+    return cache.get(key, suffix) or resize_flight.do(
+        key, _resize_to_cache, cache, key, suffix, name, width, fmt
+    )
+
+
+def open_resized(name, width, fmt):
+    """Открывает уменьшенное изображение из дискового кэша.
+
+    Файл, вытесненный из кэша между проверкой и открытием, создаётся
+    заново.
+    """
+    for _ in range(2):
+        path = resized_path(name, width, fmt)
+        try:
+            return open(path, 'rb')
+        except FileNotFoundError:
+            continue
+    raise FileNotFoundError(path)
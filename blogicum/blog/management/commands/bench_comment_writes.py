@@ -0,0 +1,136 @@
+import os
+import threading
+from statistics import quantiles
+from time import perf_counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+
+from blog.models import Category, Post
+from core.constants import USER
+from core.db import write_coordinator
+
+POST_TEXT_SIZE = 20_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет пропускную способность записи комментариев при пачке '
+        'одновременных запросов. Запросы идут через полный стек Django, '
+        'каждый поток со своим соединением с БД. Созданные пост, '
+        'пользователи и комментарии в конце удаляются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--comments', type=int, default=50)
+        parser.add_argument(
+            '--coordinated',
+            action='store_true',
+            help='Писать через координатор записи (WRITE_COORDINATOR).',
+        )
+
+    def write_comments(
+        self, url, user, n_comments, barrier, latencies, errors
+    ):
+        client = Client()
+        client.force_login(user)
+        barrier.wait()
+        try:
+            for number in range(n_comments):
+                started = perf_counter()
+                try:
+                    response = client.post(
+                        url, {'text': f'Комментарий {number}'}
+                    )
+                except Exception as error:
+                    errors.append(type(error).__name__)
+                    continue
+                if response.status_code != 302:
+                    errors.append(str(response.status_code))
+                    continue
+                latencies.append(perf_counter() - started)
+        finally:
+            connections.close_all()
+
+    def handle(self, *args, **options):
+        n_threads = options['threads']
+        n_comments = options['comments']
+        # Имена с pid позволяют запустить несколько процессов сразу.
+        suffix = os.getpid()
+        author = USER.objects.create(
+            username=f'bench-comments-author-{suffix}'
+        )
+        category = Category.objects.create(
+            title='Бенчмарк', description='', slug=f'bench-comments-{suffix}'
+        )
+        post = Post.objects.create(
+            title='Пост', text='Текст ' * (POST_TEXT_SIZE // 6),
+            pub_date=now(), author=author, category=category,
+        )
+        users = [
+            USER.objects.create(username=f'bench-comments-{suffix}-{number}')
+            for number in range(n_threads)
+        ]
+        url = reverse('blog:add_comment', args=(post.pk,))
+        latencies = []
+        errors = []
+        barrier = threading.Barrier(n_threads + 1)
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                WRITE_COORDINATOR={
+                    **getattr(settings, 'WRITE_COORDINATOR', {}),
+                    'ENABLED': options['coordinated'],
+                },
+            ):
+                threads = [
+                    threading.Thread(
+                        target=self.write_comments,
+                        args=(
+                            url, user, n_comments, barrier, latencies,
+                            errors,
+                        ),
+                    )
+                    for user in users
+                ]
+                for thread in threads:
+                    thread.start()
+                barrier.wait()
+                started = perf_counter()
+                for thread in threads:
+                    thread.join()
+                elapsed = perf_counter() - started
+        finally:
+            post.delete()
+            category.delete()
+            for user in (author, *users):
+                user.delete()
+
+        self.stdout.write(
+            f'Потоков: {n_threads}, комментариев: {len(latencies)} за '
+            f'{elapsed:.2f} с ({len(latencies) / elapsed:.0f} в секунду), '
+            f'ошибок: {len(errors)}'
+        )
+        if len(latencies) > 1:
+            cuts = quantiles(latencies, n=100)
+            self.stdout.write(
+                f'задержка: p50 {cuts[49] * 1000:.1f} мс, '
+                f'p95 {cuts[94] * 1000:.1f} мс, '
+                f'max {max(latencies) * 1000:.1f} мс'
+            )
+        if errors:
+            self.stdout.write(f'ошибки: {", ".join(sorted(set(errors)))}')
+        if options['coordinated']:
+            stats = write_coordinator.stats()
+            self.stdout.write(
+                f'координатор: повторов {stats.get("retries", 0)}, '
+                f'отказов по сроку {stats.get("timeouts", 0)}, ожидание '
+                f'очереди {stats.get("queue_wait", 0):.2f} с, пауз перед '
+                f'повтором {stats.get("retry_wait", 0):.2f} с'
+            )
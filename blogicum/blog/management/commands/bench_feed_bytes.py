@@ -0,0 +1,132 @@
+import random
+import re
+from io import BytesIO
+from tempfile import TemporaryDirectory
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils.timezone import now
+from PIL import Image, ImageDraw
+
+from blog.models import Category, Post
+from blog.signals import process_post_image
+from core.constants import PAGINATE_BY, USER
+
+IMG_RE = re.compile(r'<img\b[^>]*>')
+ATTR_RE = re.compile(r'([\w-]+)="([^"]*)"')
+# Ширина карточки в CSS-пикселях.
+CARD_WIDTH = 640
+
+
+def make_photo(rng, size):
+    """Снимок, похожий на фотографию по сжимаемости: градиент и шум."""
+    photo = Image.merge('RGB', [
+        Image.linear_gradient('L').rotate(rng.randrange(360)).resize(size)
+        for _ in range(3)
+    ])
+    draw = ImageDraw.Draw(photo)
+    for _ in range(30):
+        x, y = rng.randrange(size[0]), rng.randrange(size[1])
+        radius = rng.randrange(50, size[0] // 4)
+        draw.ellipse(
+            (x - radius, y - radius, x + radius, y + radius),
+            fill=tuple(rng.randrange(256) for _ in range(3)),
+        )
+    noise = Image.effect_noise(size, 24).convert('RGB')
+    buffer = BytesIO()
+    Image.blend(photo, noise, 0.15).save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def media_size(url):
+    name = url[len(settings.MEDIA_URL):]
+    return default_storage.size(name)
+
+
+def pick_candidate(attrs, dpr):
+    """Файл, который браузер выберет из srcset при заданной плотности."""
+    if 'srcset' not in attrs:
+        return attrs['src']
+    candidates = []
+    for entry in attrs['srcset'].split(','):
+        url, descriptor = entry.split()
+        candidates.append((int(descriptor[:-1]), url))
+    needed = CARD_WIDTH * dpr
+    for width, url in sorted(candidates):
+        if width >= needed:
+            return url
+    return max(candidates)[1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет объём главной страницы: HTML и изображения карточек до '
+        'и после перехода на уменьшенные копии, превью и ленивую загрузку. '
+        'Посты создаются во временной транзакции, которая затем '
+        'откатывается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--width', type=int, default=4000)
+        parser.add_argument('--height', type=int, default=3000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        size = (options['width'], options['height'])
+        with TemporaryDirectory() as media_root, override_settings(
+            MEDIA_ROOT=media_root,
+            PAGE_CACHE={'ENABLED': False},
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+        ), transaction.atomic():
+            author = USER.objects.create(username='bench-feed-author')
+            category = Category.objects.create(
+                title='Бенчмарк', description='', slug='bench-feed'
+            )
+            for number in range(PAGINATE_BY):
+                post = Post.objects.create(
+                    title=f'Пост {number}', text='Текст', pub_date=now(),
+                    author=author, category=category,
+                    image=ContentFile(make_photo(rng, size), 'photo.jpg'),
+                )
+                process_post_image(post.pk, post.image.name)
+
+            html = Client().get('/').content
+            cards = [
+                dict(ATTR_RE.findall(tag))
+                for tag in IMG_RE.findall(html.decode())
+                if 'post_images/' in tag
+            ]
+            placeholders = sum(
+                len(attrs.get('style', '')) for attrs in cards
+            )
+            originals = sum(
+                media_size(post.image.url)
+                for post in Post.objects.filter(author=author)
+            )
+            self.stdout.write(
+                f'HTML: {len(html) / 1024:.1f} КБ, из них превью '
+                f'{placeholders / 1024:.1f} КБ; карточек: {len(cards)}'
+            )
+            self.stdout.write(
+                f'оригиналы изображений: {originals / 1024:.1f} КБ'
+            )
+            for dpr in (1, 2):
+                eager = deferred = 0
+                for attrs in cards:
+                    size = media_size(pick_candidate(attrs, dpr))
+                    if attrs.get('loading') == 'lazy':
+                        deferred += size
+                    else:
+                        eager += size
+                self.stdout.write(
+                    f'DPR {dpr}: без ленивой загрузки '
+                    f'{(eager + deferred) / 1024:7.1f} КБ, с ней сразу '
+                    f'{eager / 1024:7.1f} КБ и при прокрутке ещё '
+                    f'{deferred / 1024:7.1f} КБ'
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,100 @@
+import random
+from functools import partial
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from blog.models import Category, Post
+from blog.search import make_snippet
+from core.constants import USER
+
+SYLLABLES = (
+    'ма', 'ло', 'ре', 'ка', 'ни', 'ту', 'по', 'да', 'ле', 'ви', 'мо',
+    'ра', 'ст', 'ко', 'не', 'ше', 'зи', 'гу', 'бо', 'чи', 'ря', 'ве',
+)
+VOCABULARY_SIZE = 5000
+QUERY_RANKS = ((10,), (500,), (3000,), (50, 800))
+BATCH_SIZE = 2000
+
+
+def build_vocabulary(rng):
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add(''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+def random_text(rng, vocabulary, weights, n_words):
+    return ' '.join(rng.choices(vocabulary, weights, k=n_words)).capitalize()
+
+
+def with_snippets(query, posts):
+    return [(post, make_snippet(query, post.text)) for post in posts]
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск через icontains и через индекс FTS5. Посты '
+        'создаются во временной транзакции, которая затем откатывается.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def timed(self, func, repeat):
+        started = perf_counter()
+        for _ in range(repeat):
+            result = func()
+        return (perf_counter() - started) / repeat * 1000, result
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        repeat = options['repeat']
+        vocabulary = build_vocabulary(rng)
+        # Частоты слов убывают по закону Ципфа, как в естественном тексте.
+        weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+        with transaction.atomic():
+            author = USER.objects.create(username='bench-search-author')
+            category = Category.objects.create(
+                title='Бенчмарк', description='', slug='bench-search'
+            )
+            n_posts = options['posts']
+            for start in range(0, n_posts, BATCH_SIZE):
+                Post.objects.bulk_create(
+                    Post(
+                        title=random_text(rng, vocabulary, weights, 4),
+                        text=random_text(rng, vocabulary, weights, 80),
+                        author=author,
+                        category=category,
+                    )
+                    for _ in range(min(BATCH_SIZE, n_posts - start))
+                )
+            self.stdout.write(f'Постов в таблице: {Post.objects.count()}')
+
+            published = Post.published_objects.feed()
+            for ranks in QUERY_RANKS:
+                query = ' '.join(vocabulary[rank] for rank in ranks)
+                condition = Q()
+                for word in query.split():
+                    condition &= (
+                        Q(title__icontains=word) | Q(text__icontains=word)
+                    )
+                by_icontains = published.filter(condition)
+                by_fts = published.search(query)
+                self.stdout.write(f'Запрос «{query}»:')
+                for label, queryset, render in (
+                    ('icontains', by_icontains, list),
+                    ('FTS5', by_fts, partial(with_snippets, query)),
+                ):
+                    page_ms, _ = self.timed(
+                        lambda: render(queryset[:10]), repeat
+                    )
+                    count_ms, found = self.timed(queryset.count, repeat)
+                    self.stdout.write(
+                        f'  {label:<10} первая страница {page_ms:8.2f} мс, '
+                        f'подсчёт {count_ms:8.2f} мс, найдено {found}'
+                    )
+            transaction.set_rollback(True)
@@ -0,0 +1,67 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+
+from blog.models import ImageStatus, Post
+from blog.signals import process_post_image
+
+BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт уменьшенные копии изображений постов и показывает '
+        'очередь обработки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pending',
+            action='store_true',
+            help='Обработать только посты без готовых копий или превью.',
+        )
+        parser.add_argument(
+            '--status',
+            action='store_true',
+            help='Только показать число постов в каждом статусе.',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать копии, даже если они уже есть.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество постов, читаемых из БД за один запрос.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if options['status']:
+            counts = Counter(dict(
+                posts.order_by().values_list('image_status')
+                .annotate(total=Count('pk'))
+            ))
+            for status in ImageStatus:
+                self.stdout.write(f'{status.label}: {counts[status.value]}')
+            return
+        if options['pending']:
+            posts = posts.filter(
+                ~Q(image_status=ImageStatus.READY) | Q(image_placeholder='')
+            )
+        rows = (
+            posts.order_by('pk')
+            .values_list('pk', 'image')
+            .iterator(chunk_size=options['batch_size'])
+        )
+        counts = Counter(
+            process_post_image(pk, name, force=options['force'])
+            for pk, name in rows
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {counts[ImageStatus.READY]}, '
+            f'ошибок: {counts[ImageStatus.FAILED]}.'
+        ))
@@ -0,0 +1,128 @@
+import os
+import re
+import time
+from pathlib import PurePosixPath
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post, PostImage
+
+BATCH_SIZE = 400
+GRACE_HOURS = 24
+RENDITION_DIR_RE = re.compile(r'^\d+w$')
+
+
+def source_names(name):
+    """Имена оригиналов, которым может принадлежать файл.
+
+    Уменьшенные копии лежат в подкаталоге <ширина>w рядом с оригиналом,
+    копии GIF, BMP и TIFF получают дополнительное расширение .jpg.
+    """
+    path = PurePosixPath(name)
+    if not RENDITION_DIR_RE.match(path.parent.name):
+        return [name]
+    original = path.parent.parent / path.name
+    names = [str(original)]
+    if original.suffix == '.jpg':
+        names.append(str(original.with_suffix('')))
+    return names
+
+
+def iter_files(root, directory):
+    """Обходит каталог, не собирая список файлов в памяти."""
+    try:
+        entries = os.scandir(os.path.join(root, directory))
+    except FileNotFoundError:
+        return
+    with entries:
+        for entry in entries:
+            name = f'{directory}/{entry.name}'
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_files(root, name)
+            elif entry.is_file(follow_symlinks=False):
+                stat = entry.stat(follow_symlinks=False)
+                yield name, stat.st_size, stat.st_mtime
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет файлы изображений постов и их уменьшенные копии, на '
+        'которые не ссылается ни один пост. Файлы, изменённые в течение '
+        'льготного периода, не трогаются, поэтому команду можно запускать '
+        'на работающем сайте.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            default=GRACE_HOURS,
+            help='Не удалять файлы, изменённые за это число часов.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество файлов, проверяемых за один запрос к БД.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать файлы, которые будут удалены.',
+        )
+
+    def handle(self, *args, **options):
+        field = Post._meta.get_field('image')
+        self.storage = field.storage
+        self.dry_run = options['dry_run']
+        self.cutoff = time.time() - options['grace_hours'] * 60 * 60
+        self.n_checked = self.n_deleted = self.reclaimed = 0
+        batch = []
+        for name, size, mtime in iter_files(
+            self.storage.location, field.upload_to
+        ):
+            self.n_checked += 1
+            if mtime >= self.cutoff:
+                continue
+            batch.append((name, size))
+            if len(batch) >= options['batch_size']:
+                self.collect(batch)
+                batch = []
+        if batch:
+            self.collect(batch)
+        verb = 'Будет удалено' if self.dry_run else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено файлов: {self.n_checked}. {verb} файлов: '
+            f'{self.n_deleted}, {self.reclaimed / (1024 * 1024):.1f} МБ.'
+        ))
+
+    def collect(self, batch):
+        candidates = {
+            source for name, _ in batch for source in source_names(name)
+        }
+        referenced = set(
+            Post.objects.filter(image__in=candidates)
+            .values_list('image', flat=True)
+        )
+        orphans = [
+            (name, size) for name, size in batch
+            if referenced.isdisjoint(source_names(name))
+        ]
+        deleted = []
+        for name, size in orphans:
+            if not self.dry_run:
+                # Файл, на который только что сослалась одинаковая
+                # загрузка, получил свежее время изменения.
+                try:
+                    if os.stat(self.storage.path(name)).st_mtime >= (
+                        self.cutoff
+                    ):
+                        continue
+                except FileNotFoundError:
+                    continue
+                self.storage.delete(name)
+            deleted.append(name)
+            self.reclaimed += size
+        self.n_deleted += len(deleted)
+        if deleted and not self.dry_run:
+            PostImage.objects.filter(name__in=deleted).delete()
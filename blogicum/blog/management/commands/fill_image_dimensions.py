@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+
+from blog.models import Post
+from core.cache import SITE_SCOPE, bump_scopes
+from core.fields import get_oriented_dimensions
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Заполняет размеры изображений у постов, где их нет.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество постов, обрабатываемых за одну транзакцию.',
+        )
+
+    def handle(self, *args, **options):
+        storage = Post._meta.get_field('image').storage
+        posts = Post.objects.exclude(image='').filter(image_width=None)
+        last_id = 0
+        n_filled = n_missing = 0
+        while True:
+            rows = list(
+                posts.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', 'image')[:options['batch_size']]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            updated_at = now()
+            filled = []
+            for pk, name in rows:
+                try:
+                    with storage.open(name, 'rb') as file:
+                        width, height = get_oriented_dimensions(file)
+                except FileNotFoundError:
+                    width = height = None
+                if width is None:
+                    n_missing += 1
+                    continue
+                filled.append(Post(
+                    pk=pk,
+                    image_width=width,
+                    image_height=height,
+                    updated_at=updated_at,
+                ))
+            with transaction.atomic():
+                Post.objects.bulk_update(
+                    filled, ('image_width', 'image_height', 'updated_at')
+                )
+            n_filled += len(filled)
+        if n_filled:
+            bump_scopes(SITE_SCOPE)
+        self.stdout.write(self.style.SUCCESS(
+            f'Заполнено: {n_filled}, не удалось прочитать: {n_missing}.'
+        ))
@@ -0,0 +1,95 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+
+from blog.images import rendition_names
+from blog.models import Post, PostImage
+from blog.signals import add_image_refs
+from core.cache import SITE_SCOPE, bump_scopes
+from core.storage import HASHED_NAME_RE, post_image_storage
+
+BATCH_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит изображения постов в хранилище с именами по хешу '
+        'содержимого и обновляет ссылки на них.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество постов, обрабатываемых за одну транзакцию.',
+        )
+
+    def handle(self, *args, **options):
+        legacy_posts = (
+            Post.objects.exclude(image='')
+            .exclude(image__regex=HASHED_NAME_RE)
+        )
+        last_id = 0
+        n_moved = n_missing = 0
+        while True:
+            rows = list(
+                legacy_posts.filter(pk__gt=last_id)
+                .order_by('pk')
+                .values_list('pk', 'image')[:options['batch_size']]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            moved = {}
+            for _, name in rows:
+                if name in moved:
+                    continue
+                new_name = self.copy_image(name)
+                if new_name is None:
+                    n_missing += 1
+                else:
+                    moved[name] = new_name
+            with transaction.atomic():
+                for name, new_name in moved.items():
+                    n_posts = Post.objects.filter(image=name).update(
+                        image=new_name, updated_at=now()
+                    )
+                    add_image_refs(new_name, n_posts)
+                    PostImage.objects.filter(name=name).delete()
+            for name in moved:
+                self.delete_legacy(name)
+            n_moved += len(moved)
+        if n_moved:
+            bump_scopes(SITE_SCOPE)
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено файлов: {n_moved}, не найдено: {n_missing}.'
+        ))
+
+    def copy_image(self, name):
+        """Копирует оригинал и его уменьшенные копии под новыми именами."""
+        try:
+            with post_image_storage.open(name, 'rb') as file:
+                new_name = post_image_storage.save(name, file)
+        except FileNotFoundError:
+            self.stderr.write(f'Файл {name} не найден.')
+            return None
+        new_renditions = rendition_names(new_name)
+        for width, rendition in rendition_names(name).items():
+            if (
+                default_storage.exists(rendition)
+                and not default_storage.exists(new_renditions[width])
+            ):
+                with default_storage.open(rendition, 'rb') as file:
+                    default_storage.save(new_renditions[width], file)
+        return new_name
+
+    def delete_legacy(self, name):
+        # Удаляем только после коммита: при откате транзакции посты
+        # продолжали бы ссылаться на старые файлы.
+        if Post.objects.filter(image=name).exists():
+            return
+        for rendition in rendition_names(name).values():
+            default_storage.delete(rendition)
+        post_image_storage.delete(name)
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from blog.search import drop_search_index, ensure_search_index
+
+
+def create_index(apps, schema_editor):
+    ensure_search_index(schema_editor.connection.alias)
+
+
+def drop_index(apps, schema_editor):
+    drop_search_index(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:40
+
+from django.db import migrations, models
+
+
+def mark_images_pending(apps, schema_editor):
+    # Копии для уже загруженных изображений создаёт build_image_renditions,
+    # до этого показываются оригиналы.
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.exclude(image='').update(image_status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_status',
+            field=models.CharField(choices=[('ready', 'Готово'), ('pending', 'Обрабатывается'), ('failed', 'Ошибка')], default='ready', editable=False, max_length=7, verbose_name='Уменьшенные копии изображения'),
+        ),
+        migrations.RunPython(mark_images_pending, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:45
+
+import core.storage
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_image_refs(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    PostImage = apps.get_model('blog', 'PostImage')
+    PostImage.objects.bulk_create(
+        PostImage(name=row['image'], ref_count=row['total'])
+        for row in Post.objects.exclude(image='')
+        .order_by()
+        .values('image')
+        .annotate(total=Count('pk'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_image_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Файл')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Число ссылок')),
+            ],
+            options={
+                'verbose_name': 'файл изображения',
+                'verbose_name_plural': 'Файлы изображений',
+            },
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=core.storage.ContentAddressedStorage(), upload_to='post_images', verbose_name='Изображение'),
+        ),
+        migrations.RunPython(count_image_refs, migrations.RunPython.noop),
+    ]
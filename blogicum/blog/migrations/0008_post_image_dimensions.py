@@ -0,0 +1,30 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:48
+
+import core.fields
+import core.storage
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_image_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_height',
+            field=core.fields.ImageHeightField(editable=False, null=True, verbose_name='Высота изображения'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_width',
+            field=core.fields.ImageWidthField(editable=False, null=True, verbose_name='Ширина изображения'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=core.fields.ImageField(blank=True, height_field='image_height', storage=core.storage.ContentAddressedStorage(), upload_to='post_images', verbose_name='Изображение', width_field='image_width'),
+        ),
+    ]
@@ -1,20 +1,103 @@
-from django.db import models
+from django.db import connection, models
+from django.db.models.expressions import RawSQL
 from django.utils.timezone import now
 
 from core.constants import CHAR_LENGTH, USER
+from core.fields import ImageField, ImageHeightField, ImageWidthField
 from core.models import BaseModel, FullBaseModel
+from core.storage import post_image_storage
+from .search import FTS_TABLE, build_match_query, is_supported
 
 
-class PublishedPostManager(models.Manager):
-    """Класс для получения опубликованных постов."""
+FEED_FIELDS = (
+    'title',
+    'text',
+    'pub_date',
+    'is_published',
+    'updated_at',
+    'image',
+    'image_width',
+    'image_height',
+    'image_status',
+    'image_placeholder',
+    'comment_count',
+    'author__username',
+    'category__title',
+    'category__slug',
+    'category__is_published',
+    'category__updated_at',
+    'location__name',
+    'location__is_published',
+    'location__updated_at',
+)
 
-    def get_queryset(self):
-        return super().get_queryset().filter(
+
+class ImageStatus(models.TextChoices):
+    READY = 'ready', 'Готово'
+    PENDING = 'pending', 'Обрабатывается'
+    FAILED = 'failed', 'Ошибка'
+
+
+class PostQuerySet(models.QuerySet):
+    """Класс для построения запросов к таблице Post."""
+
+    def published(self):
+        return self.filter(
             pub_date__lte=now(),
             is_published=True,
             category__is_published=True,
         )
 
+    def feed(self):
+        """Посты для ленты: только поля, нужные карточке поста."""
+        return self.select_related(
+            'author', 'category', 'location'
+        ).only(
+            *FEED_FIELDS
+        ).order_by('-pub_date', '-pk')
+
+    def matching(self, query):
+        """Посты, в заголовке или тексте которых встречаются слова запроса."""
+        match = build_match_query(query)
+        if not match:
+            return self.none()
+        if not is_supported(connection):
+            return self.filter(
+                models.Q(title__icontains=query)
+                | models.Q(text__icontains=query)
+            )
+        return self.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (match,),
+        ))
+
+    def search(self, query):
+        """Ранжированный полнотекстовый поиск: лучшие совпадения первыми."""
+        match = build_match_query(query)
+        if not match or not is_supported(connection):
+            return self.matching(query)
+        return self.extra(
+            tables=[FTS_TABLE],
+            where=[
+                f'{FTS_TABLE}.rowid = blog_post.id',
+                f'{FTS_TABLE} MATCH %s',
+            ],
+            params=[match],
+            select={'rank': f'bm25({FTS_TABLE}, 10.0, 1.0)'},
+        ).order_by('rank', '-pub_date')
+
+    def author_feed(self, author, viewer):
+        """Лента автора; владельцу видны и неопубликованные посты."""
+        posts = self if viewer == author else self.published()
+        return posts.filter(author=author).feed()
+
+
+class PublishedPostManager(models.Manager.from_queryset(PostQuerySet)):
+    """Класс для получения опубликованных постов."""
+
+    def get_queryset(self):
+        return super().get_queryset().published()
+
 
 class Post(FullBaseModel):
     """Класс для описания таблицы Post в БД."""
@@ -44,24 +127,85 @@ class Post(FullBaseModel):
         null=True,
         verbose_name='Категория'
     )
-    image = models.ImageField(
+    image = ImageField(
         'Изображение',
         upload_to='post_images',
+        storage=post_image_storage,
+        width_field='image_width',
+        height_field='image_height',
         blank=True
     )
+    image_width = ImageWidthField('Ширина изображения')
+    image_height = ImageHeightField('Высота изображения')
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+    image_status = models.CharField(
+        'Уменьшенные копии изображения',
+        max_length=7,
+        choices=ImageStatus.choices,
+        default=ImageStatus.READY,
+        editable=False
+    )
+    image_placeholder = models.TextField(
+        'Превью изображения',
+        blank=True,
+        default='',
+        editable=False
+    )
 
-    objects = models.Manager()
+    objects = PostQuerySet.as_manager()
     published_objects = PublishedPostManager()
 
+    UPDATED_SEPARATELY = ('comment_count', 'image_status', 'image_placeholder')
+
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
         default_related_name = 'posts'
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                name='post_published_feed_idx',
+                condition=models.Q(is_published=True),
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_feed_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    @property
+    def has_renditions(self):
+        return self.image_status == ImageStatus.READY
+
+    def save(self, *args, **kwargs):
+        # Счётчик комментариев и результаты обработки изображения меняются
+        # только атомарными UPDATE, поэтому при обычном сохранении поста их
+        # значения не перезаписываем.
+        if (
+            self.pk is not None
+            and not self._state.adding
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.UPDATED_SEPARATELY
+            ]
+        super().save(*args, **kwargs)
+
 
 class Category(FullBaseModel):
     """Класс для описания таблицы Category в БД."""
@@ -100,6 +244,16 @@ class Location(BaseModel):
         return self.name
 
 
+class CommentQuerySet(models.QuerySet):
+    """Класс для построения запросов к таблице Comment."""
+
+    def thread(self):
+        """Комментарии для ветки под постом: у автора только id и имя."""
+        return self.select_related('author').only(
+            'text', 'created_at', 'post_id', 'author__username'
+        )
+
+
 class Comment(models.Model):
     """Класс для описания таблицы Comment в БД."""
 
@@ -112,8 +266,34 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(USER, on_delete=models.CASCADE)
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_thread_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text
+
+
+class PostImage(models.Model):
+    """Файл изображения и число постов, которые на него ссылаются.
+
+    Одинаковые загрузки хранятся в одном файле, поэтому удалять файл
+    можно только когда счётчик ссылок дошёл до нуля.
+    """
+
+    name = models.CharField('Файл', max_length=100, unique=True)
+    ref_count = models.PositiveIntegerField('Число ссылок', default=0)
+
+    class Meta:
+        verbose_name = 'файл изображения'
+        verbose_name_plural = 'Файлы изображений'
+
+    def __str__(self):
+        return self.name
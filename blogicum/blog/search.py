@@ -0,0 +1,154 @@
+import re
+
+from django.db import connections
+
+FTS_TABLE = 'blog_post_fts'
+
+# Окончания для грубого отсечения словоизменения в запросе: вместе с
+# префиксным поиском FTS5 «москва» находит и «москве», и «москвы».
+RUSSIAN_ENDINGS = sorted(
+    (
+        'иями', 'ями', 'ами', 'ией', 'иям', 'ием', 'иях', 'ого', 'его',
+        'ому', 'ему', 'ыми', 'ими', 'ая', 'яя', 'ое', 'ее', 'ие', 'ые',
+        'ой', 'ей', 'ий', 'ый', 'ым', 'им', 'ом', 'ем', 'ам', 'ям', 'ах',
+        'ях', 'ов', 'ев', 'ию', 'ия', 'ть', 'ешь', 'ет', 'ют', 'ут',
+        'ат', 'ят', 'ла', 'ло', 'ли', 'а', 'я', 'о', 'е', 'и', 'ы', 'у',
+        'ю', 'ь', 'й',
+    ),
+    key=len,
+    reverse=True,
+)
+MIN_STEM_LENGTH = 3
+MAX_QUERY_TERMS = 8
+SNIPPET_WORDS = 24
+WORD_RE = re.compile(r'\w+')
+
+# Префиксные индексы под длины основ из build_match_query: без них
+# запрос «"осн"*» перебирает все термы словаря с этим началом.
+CREATE_INDEX_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "title, text, content='blog_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='3 4 5 6')"
+)
+# Django пересоздаёт таблицу blog_post при изменении её схемы в SQLite,
+# и триггеры при этом пропадают, поэтому они создаются идемпотентно.
+CREATE_TRIGGERS_SQL = (
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+    AFTER INSERT ON blog_post BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+    AFTER DELETE ON blog_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF title, text ON blog_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END""",
+)
+TRIGGER_NAMES = tuple(f'{FTS_TABLE}_{suffix}' for suffix in ('ai', 'ad', 'au'))
+
+
+def is_supported(connection):
+    return connection.vendor == 'sqlite'
+
+
+def ensure_search_index(using='default'):
+    """Создаёт поисковый индекс и триггеры, если их нет.
+
+    Если триггеры пропали, индекс мог отстать от таблицы постов,
+    поэтому в этом случае он перестраивается целиком.
+    """
+    connection = connections[using]
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master "
+            "WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+            TRIGGER_NAMES,
+        )
+        (n_triggers,) = cursor.fetchone()
+        if n_triggers == len(TRIGGER_NAMES):
+            return
+        cursor.execute(CREATE_INDEX_SQL)
+        for sql in CREATE_TRIGGERS_SQL:
+            cursor.execute(sql)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def drop_search_index(using='default'):
+    connection = connections[using]
+    if not is_supported(connection):
+        return
+    with connection.cursor() as cursor:
+        for name in TRIGGER_NAMES:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def make_snippet(query, text, width=SNIPPET_WORDS):
+    """Фрагмент текста вокруг первого найденного слова запроса.
+
+    Строится в Python по уже загруженному тексту: snippet() из FTS5
+    заново разворачивает префиксные запросы и на частых словах медленный.
+    Найденные слова обрамлены управляющими символами STX и ETX.
+    """
+    stems = query_stems(query)
+
+    def is_hit(token):
+        return bool(stems) and token.lower().startswith(stems)
+
+    words = text.split()
+    first_hit = next(
+        (
+            index for index, word in enumerate(words)
+            if any(is_hit(token) for token in WORD_RE.findall(word))
+        ),
+        0,
+    )
+    start = max(0, first_hit - width // 3)
+    fragment = WORD_RE.sub(
+        lambda token: (
+            f'\x02{token[0]}\x03' if is_hit(token[0]) else token[0]
+        ),
+        ' '.join(words[start:start + width]),
+    )
+    return ''.join((
+        '…' if start else '',
+        fragment,
+        '…' if start + width < len(words) else '',
+    ))
+
+
+def stem(word):
+    for ending in RUSSIAN_ENDINGS:
+        if (
+            word.endswith(ending)
+            and len(word) - len(ending) >= MIN_STEM_LENGTH
+        ):
+            return word[:-len(ending)]
+    return word
+
+
+def query_stems(text):
+    return tuple(
+        stem(word)
+        for word in WORD_RE.findall(text.lower())[:MAX_QUERY_TERMS]
+    )
+
+
+def build_match_query(text):
+    """Превращает пользовательский ввод в безопасный запрос FTS5.
+
+    Каждое слово становится префиксной фразой, слова объединяются по И;
+    синтаксис FTS5 из ввода пользователя не интерпретируется.
+    """
+    return ' '.join(f'"{word_stem}"*' for word_stem in query_stems(text))
@@ -0,0 +1,300 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils.timezone import now
+
+from core.cache import (
+    INDEX_SCOPE, SITE_SCOPE, bump_scopes_on_commit, category_scope,
+    post_scope, profile_scope
+)
+from core.constants import USER
+from .images import (
+    image_pool, image_processing_settings, make_placeholder, make_renditions,
+    missing_renditions, rendition_flight
+)
+from .models import Category, Comment, ImageStatus, Location, Post, PostImage
+from .search import ensure_search_index
+
+
+def touch_post(post_id, comment_delta=0):
+    """Атомарно обновляет счётчик комментариев и время изменения поста.
+
+    Время изменения поста сдвигается при любом изменении его комментариев,
+    чтобы по нему можно было проверять актуальность страницы поста.
+    """
+    Post.objects.filter(pk=post_id).update(
+        # Счётчик, разошедшийся с данными, не уходит ниже нуля: иначе
+        # удаление комментария нарушило бы ограничение CHECK.
+        comment_count=Greatest(F('comment_count') + comment_delta, 0),
+        updated_at=now(),
+    )
+
+
+def recount_comments(post_id):
+    """Пересчитывает счётчик комментариев поста по таблице комментариев.
+
+    Нужен для loaddata: сырое сохранение не вызывает touch_post, а пост
+    из фикстуры приходит с нулевым счётчиком.
+    """
+    Post.objects.filter(pk=post_id).update(comment_count=Coalesce(
+        Subquery(
+            Comment.objects.filter(post=OuterRef('pk'))
+            .order_by()
+            .values('post')
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0,
+    ))
+
+
+def add_image_refs(name, delta):
+    """Атомарно меняет счётчик постов, ссылающихся на файл изображения."""
+    if not name or not delta:
+        return
+    if delta > 0:
+        PostImage.objects.get_or_create(name=name)
+        PostImage.objects.filter(name=name).update(
+            ref_count=F('ref_count') + delta
+        )
+    else:
+        PostImage.objects.filter(name=name, ref_count__gte=-delta).update(
+            ref_count=F('ref_count') + delta
+        )
+
+
+def post_cache_scopes(post_id):
+    """Области кэша страниц, на которых показывается пост."""
+    scopes = [INDEX_SCOPE, post_scope(post_id)]
+    row = Post.objects.filter(pk=post_id).values_list(
+        'category__slug', 'author__username'
+    ).first()
+    if row is not None:
+        slug, username = row
+        if slug:
+            scopes.append(category_scope(slug))
+        scopes.append(profile_scope(username))
+    return scopes
+
+
+def process_post_image(post_id, name, force=False):
+    """Создаёт уменьшенные копии и превью изображения поста.
+
+    Если изображение успели заменить, ничего не делает: копии для нового
+    изображения создаст его собственная задача. Возвращает новый статус.
+    """
+    post = (
+        Post.objects.only(
+            'image', 'image_width', 'image_height', 'image_placeholder'
+        )
+        .filter(pk=post_id, image=name)
+        .first()
+    )
+    if post is None:
+        return None
+    # Одинаковые загрузки делят файл, а задачи их постов могут идти
+    # одновременно: копии создаёт только одна из них.
+    rendition_flight.do(name, make_renditions, post.image, force)
+    status = (
+        ImageStatus.FAILED if missing_renditions(post.image)
+        else ImageStatus.READY
+    )
+    placeholder = post.image_placeholder
+    if force or not placeholder:
+        placeholder = make_placeholder(post.image)
+    if Post.objects.filter(pk=post_id, image=name).update(
+        image_status=status, image_placeholder=placeholder, updated_at=now()
+    ):
+        bump_scopes_on_commit(*post_cache_scopes(post_id))
+    return status
+
+
+def submit_image_processing(post_id, name):
+    if not image_processing_settings()['ASYNC']:
+        process_post_image(post_id, name)
+        return
+    # При переполненной очереди пост остаётся в статусе «Обрабатывается»,
+    # его подберёт команда build_image_renditions --pending.
+    # Ключ включает пост: у постов с одинаковым изображением одно имя
+    # файла, и задача второго поста иначе считалась бы уже поставленной.
+    image_pool.submit((post_id, name), process_post_image, post_id, name)
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    """Запоминает пост, к которому комментарий относился до сохранения."""
+    instance._previous_post_id = None
+    if instance.pk is not None:
+        instance._previous_post_id = (
+            Comment.objects.filter(pk=instance.pk)
+            .values_list('post_id', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, raw, **kwargs):
+    if raw:
+        recount_comments(instance.post_id)
+        return
+    previous_post_id = getattr(instance, '_previous_post_id', None)
+    if created:
+        touch_post(instance.post_id, 1)
+        bump_scopes_on_commit(*post_cache_scopes(instance.post_id))
+    elif previous_post_id and previous_post_id != instance.post_id:
+        touch_post(previous_post_id, -1)
+        touch_post(instance.post_id, 1)
+        bump_scopes_on_commit(
+            *post_cache_scopes(previous_post_id),
+            *post_cache_scopes(instance.post_id),
+        )
+    else:
+        touch_post(instance.post_id)
+        bump_scopes_on_commit(post_scope(instance.post_id))
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    touch_post(instance.post_id, -1)
+    bump_scopes_on_commit(*post_cache_scopes(instance.post_id))
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def remember_post_pages(sender, instance, raw=False, **kwargs):
+    """Запоминает страницы, на которых пост показывался до изменения."""
+    instance._previous_cache_scopes = []
+    if not raw and instance.pk is not None:
+        instance._previous_cache_scopes = post_cache_scopes(instance.pk)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_image(sender, instance, raw, **kwargs):
+    instance._previous_image = None
+    if not raw and instance.pk is not None:
+        instance._previous_image = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list('image', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Post)
+def recount_loaded_comments(sender, instance, raw, **kwargs):
+    """Комментарии из фикстуры могли загрузиться раньше самого поста."""
+    if raw:
+        recount_comments(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def count_image_refs(sender, instance, raw, **kwargs):
+    previous_image = getattr(instance, '_previous_image', None)
+    if raw or previous_image == instance.image.name:
+        return
+    add_image_refs(instance.image.name, 1)
+    add_image_refs(previous_image, -1)
+
+
+@receiver(post_save, sender=Post)
+def schedule_image_processing(sender, instance, raw, **kwargs):
+    """Ставит создание копий изображения в очередь после коммита.
+
+    Пока копии не готовы, на страницах показывается оригинал.
+    """
+    if raw or not instance.image or not missing_renditions(instance.image):
+        return
+    Post.objects.filter(pk=instance.pk).update(
+        image_status=ImageStatus.PENDING, image_placeholder=''
+    )
+    instance.image_status = ImageStatus.PENDING
+    instance.image_placeholder = ''
+    transaction.on_commit(partial(
+        submit_image_processing, instance.pk, instance.image.name
+    ))
+
+
+@receiver(post_save, sender=Post)
+def invalidate_post_pages(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    bump_scopes_on_commit(
+        *getattr(instance, '_previous_cache_scopes', ()),
+        *post_cache_scopes(instance.pk),
+    )
+
+
+@receiver(post_delete, sender=Post)
+def release_image_ref(sender, instance, **kwargs):
+    add_image_refs(instance.image.name, -1)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post_pages(sender, instance, **kwargs):
+    bump_scopes_on_commit(*getattr(instance, '_previous_cache_scopes', ()))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_all_pages(sender, raw=False, **kwargs):
+    """Название категории и места выводится почти на каждой странице."""
+    if not raw:
+        bump_scopes_on_commit(SITE_SCOPE)
+
+
+@receiver(pre_save, sender=USER)
+def remember_username(sender, instance, raw, update_fields=None, **kwargs):
+    instance._previous_username = None
+    if (
+        not raw
+        and instance.pk is not None
+        and update_fields != frozenset({'last_login'})
+    ):
+        instance._previous_username = (
+            USER.objects.filter(pk=instance.pk)
+            .values_list('username', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=USER)
+def invalidate_profile_pages(
+    sender, instance, raw, update_fields=None, **kwargs
+):
+    if raw or update_fields == frozenset({'last_login'}):
+        return
+    previous_username = getattr(instance, '_previous_username', None)
+    if previous_username and previous_username != instance.username:
+        # Имя пользователя выводится в карточках его постов и под его
+        # комментариями на страницах чужих постов.
+        bump_scopes_on_commit(SITE_SCOPE, profile_scope(previous_username))
+    bump_scopes_on_commit(profile_scope(instance.username))
+
+
+@receiver(post_save, sender=USER)
+def touch_commented_posts(sender, instance, raw, **kwargs):
+    """Сдвигает время изменения постов, где пользователь комментировал.
+
+    Имя комментатора выводится на странице поста, а валидаторы страницы
+    строятся по строке самого поста.
+    """
+    previous_username = getattr(instance, '_previous_username', None)
+    if raw or not previous_username or (
+        previous_username == instance.username
+    ):
+        return
+    Post.objects.filter(
+        pk__in=Comment.objects.filter(author=instance).values('post_id')
+    ).update(updated_at=now())
+
+
+def restore_search_index(sender, using, **kwargs):
+    """Возвращает триггеры поиска, если миграция пересоздала blog_post."""
+    ensure_search_index(using)
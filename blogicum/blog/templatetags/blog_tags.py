@@ -0,0 +1,34 @@
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from blog import images
+
+register = template.Library()
+
+
+@register.filter
+def highlight(snippet):
+    """Выделяет найденные слова во фрагменте, полученном из FTS5."""
+    return mark_safe(
+        escape(snippet or '')
+        .replace('\x02', '<mark>')
+        .replace('\x03', '</mark>')
+    )
+
+
+@register.filter
+def rendition_url(image, size):
+    """URL уменьшенной копии изображения: card, detail или retina."""
+    return images.rendition_url(image, size)
+
+
+@register.filter
+def srcset(image, original_width=None):
+    return images.srcset(image, original_width)
+
+
+@register.filter
+def resized_url(image, width):
+    """Подписанный URL изображения заданной ширины в формате WebP."""
+    return images.resized_url(image, int(width))
@@ -50,6 +50,21 @@ urlpatterns = [
         views.CommentCreateView.as_view(),
         name='add_comment'
     ),
+    path(
+        'posts/<int:pk>/comments/',
+        views.CommentListView.as_view(),
+        name='comments'
+    ),
+    path(
+        'search/',
+        views.PostSearchView.as_view(),
+        name='search'
+    ),
+    path(
+        'images/<str:signature>/<int:width>.<str:fmt>/<path:name>',
+        views.ResizedImageView.as_view(),
+        name='resized_image'
+    ),
     path(
         'profile/edit',
         views.EditProfileView.as_view(),
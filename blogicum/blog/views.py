@@ -1,35 +1,55 @@
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Count
-from django.http import Http404, HttpResponseRedirect
-from django.shortcuts import get_object_or_404, redirect
-from django.urls import reverse_lazy
+from django.db import IntegrityError, transaction
+from django.http import (
+    FileResponse, Http404, HttpResponseRedirect, JsonResponse
+)
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import patch_cache_control
 from django.views.generic import (
-    CreateView, DeleteView, DetailView, ListView, UpdateView
+    CreateView, DeleteView, DetailView, ListView, UpdateView, View
 )
 
 from blog.models import Category, Comment, Post
+from core.cache import (
+    INDEX_SCOPE, category_scope, post_scope, profile_scope
+)
 from core.constants import PAGINATE_BY, USER
+from core.media import media_serving_settings, offload_response
 from core.mixins import (
-    OnlyAuthorMixin, ModelPostMixin, ModelAndFormCommentMixin,
-    GetSuccessUrlPostMixin, GetSuccessUrlProfileMixin
+    AnonymousPageCacheMixin, CommentPageMixin, ConditionalGetMixin,
+    CoordinatedWriteMixin, CursorPaginationMixin, OnlyAuthorMixin,
+    ModelPostMixin, ModelAndFormCommentMixin, GetSuccessUrlPostMixin,
+    GetSuccessUrlProfileMixin, ReplicaReadMixin, ResolveOnceMixin
 )
 from .forms import CommentForm, PostForm, UserForm
+from .images import (
+    RESIZE_FORMATS, check_resize_signature, open_resized, resize_settings,
+    resized_path
+)
+from .search import make_snippet
 
 
-class IndexListView(ModelPostMixin, ListView):
+class IndexListView(
+    ReplicaReadMixin, AnonymousPageCacheMixin, ConditionalGetMixin,
+    CursorPaginationMixin, ModelPostMixin, ListView
+):
     """View для отображения главной страницы проекта."""
 
     template_name = 'blog/index.html'
     paginate_by = PAGINATE_BY
+    page_cache_name = 'index'
+
+    def get_cache_scopes(self):
+        return (INDEX_SCOPE,)
 
     def get_queryset(self):
-        return Post.published_objects.all().annotate(
-            comment_count=Count('comment')
-        ).order_by('-pub_date')
+        return Post.published_objects.feed()
 
 
 class PostCreateView(
-    LoginRequiredMixin, ModelPostMixin, GetSuccessUrlProfileMixin, CreateView
+    LoginRequiredMixin, CoordinatedWriteMixin, ModelPostMixin,
+    GetSuccessUrlProfileMixin, CreateView
 ):
     """View для отображения страницы создания поста."""
 
@@ -42,7 +62,7 @@ class PostCreateView(
 
 
 class PostEditView(
-    ModelPostMixin, GetSuccessUrlPostMixin, UpdateView
+    ResolveOnceMixin, ModelPostMixin, GetSuccessUrlPostMixin, UpdateView
 ):
     """View для отображения страницы редактирования поста."""
 
@@ -60,35 +80,58 @@ class PostEditView(
         return super().dispatch(request, *args, **kwargs)
 
 
-class PostDetailView(ModelPostMixin, DetailView):
+class PostDetailView(
+    ReplicaReadMixin, AnonymousPageCacheMixin, ConditionalGetMixin,
+    ResolveOnceMixin, CommentPageMixin, ModelPostMixin, DetailView
+):
     """View для отображения страницы поста."""
 
     template_name = 'blog/detail.html'
+    page_cache_name = 'post'
 
-    def dispatch(self, request, *args, **kwargs):
-        user = request.user
+    def get_cache_scopes(self):
+        return (post_scope(self.kwargs['pk']),)
+
+    def get_validators(self):
+        # Пост запрашивается один раз: тот же объект выводит шаблон.
         post = self.get_object()
-        if user.id != post.author_id and not post.is_published:
+        row = (
+            post.author_id,
+            post.is_published,
+            post.comment_count,
+            post.author.username,
+            post.updated_at,
+            post.category and post.category.updated_at,
+            post.location and post.location.updated_at,
+        )
+        return row, max(stamp for stamp in row[4:] if stamp)
+
+    def get_object(self, queryset=None):
+        post = super().get_object(queryset)
+        if self.request.user.id != post.author_id and not post.is_published:
             raise Http404()
 
-        return super().dispatch(request, *args, **kwargs)
+        return post
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comment.select_related('author')
+        context['comments'] = self.get_comments_page(self.object)
         return context
 
 
 class PostDeleteView(
-    OnlyAuthorMixin, ModelPostMixin, GetSuccessUrlProfileMixin, DeleteView
+    ResolveOnceMixin, OnlyAuthorMixin, ModelPostMixin,
+    GetSuccessUrlProfileMixin, DeleteView
 ):
     """View для отображения страницы удаления поста."""
 
     template_name = 'blog/create.html'
 
 
-class EditProfileView(GetSuccessUrlProfileMixin, UpdateView):
+class EditProfileView(
+    CoordinatedWriteMixin, GetSuccessUrlProfileMixin, UpdateView
+):
     """View для отображения страницы редактирования профиля."""
 
     model = USER
@@ -105,26 +148,36 @@ class EditProfileView(GetSuccessUrlProfileMixin, UpdateView):
         return self.request.user
 
 
-class ProfileDetailListView(ListView):
+class ProfileDetailListView(
+    ReplicaReadMixin, AnonymousPageCacheMixin, ConditionalGetMixin,
+    ResolveOnceMixin, ListView
+):
     """View для отображения страницы профиля."""
 
     template_name = 'blog/profile.html'
     context_object_name = 'profile'
     paginate_by = PAGINATE_BY
+    page_cache_name = 'profile'
+
+    def get_cache_scopes(self):
+        return (profile_scope(self.kwargs['username']),)
 
     def get_user(self):
-        username = self.kwargs.get('username')
-        return get_object_or_404(USER, username=username)
+        return self.resolve('profile', lambda: get_object_or_404(
+            USER, username=self.kwargs.get('username')
+        ))
+
+    def get_validators(self):
+        state, last_modified = super().get_validators()
+        profile = self.get_user()
+        # Шапка профиля зависит не только от постов пользователя.
+        profile_state = (
+            profile.get_full_name(), profile.date_joined, profile.is_staff
+        )
+        return (state, profile_state), last_modified
 
     def get_queryset(self):
-        user_id = self.get_user().id
-        if self.request.user == self.get_user():
-            posts = Post.objects.all().filter(author_id=user_id)
-        else:
-            posts = Post.published_objects.all().filter(author_id=user_id)
-        return posts.annotate(
-            comment_count=Count('comment')
-        ).order_by('-pub_date')
+        return Post.objects.author_feed(self.get_user(), self.request.user)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -132,25 +185,28 @@ class ProfileDetailListView(ListView):
         return context
 
 
-class CategoryListView(ListView):
+class CategoryListView(
+    ReplicaReadMixin, AnonymousPageCacheMixin, ConditionalGetMixin,
+    ResolveOnceMixin, CursorPaginationMixin, ListView
+):
     """View для отображения страницы с постами из определенной категории."""
 
     template_name = 'blog/category.html'
     paginate_by = PAGINATE_BY
+    page_cache_name = 'category'
+
+    def get_cache_scopes(self):
+        return (category_scope(self.kwargs['category_slug']),)
 
     def get_category(self):
-        return get_object_or_404(
+        return self.resolve('category', lambda: get_object_or_404(
             Category, is_published=True, slug=self.kwargs['category_slug']
-        )
+        ))
 
     def get_queryset(self):
         return Post.published_objects.filter(
             category=self.get_category()
-        ).annotate(
-            comment_count=Count('comment')
-        ).order_by(
-            '-pub_date'
-        )
+        ).feed()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -158,26 +214,142 @@ class CategoryListView(ListView):
         return context
 
 
+class PostSearchView(ListView):
+    """View для отображения результатов полнотекстового поиска по постам."""
+
+    template_name = 'blog/search.html'
+    paginate_by = PAGINATE_BY
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return Post.published_objects.feed().search(self.get_query())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_query()
+        for post in context['page_obj']:
+            post.snippet = make_snippet(query, post.text)
+        context['query'] = query
+        return context
+
+
+class ResizedImageView(View):
+    """View для выдачи изображения в запрошенной ширине и формате.
+
+    Параметры подписаны, поэтому ссылку нельзя подобрать для произвольной
+    ширины. Вариант не меняется, пока не изменился оригинал, поэтому ответ
+    может годами храниться в кэше браузера и обратного прокси.
+    """
+
+    def get(self, request, signature, width, fmt, name):
+        if fmt not in RESIZE_FORMATS or not check_resize_signature(
+            signature, name, width, fmt
+        ):
+            raise Http404
+        content_type = f'image/{fmt}'
+        config = media_serving_settings()
+        try:
+            if config['OFFLOAD']:
+                path = resized_path(name, width, fmt)
+                response = offload_response(
+                    config['RESIZE_ACCEL_PREFIX'],
+                    path.relative_to(resize_settings()['CACHE_DIR'])
+                    .as_posix(),
+                    path,
+                    content_type,
+                    config,
+                )
+            else:
+                response = FileResponse(
+                    open_resized(name, width, fmt), content_type=content_type
+                )
+        except OSError:
+            raise Http404
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=resize_settings()['MAX_AGE'],
+            immutable=True,
+        )
+        return response
+
+
+class CommentListView(CommentPageMixin, View):
+    """View для подгрузки следующей страницы комментариев к посту.
+
+    Отдаёт HTML-фрагмент для вставки под уже показанными комментариями,
+    а с параметром format=json — те же комментарии в JSON.
+    """
+
+    def get(self, request, pk):
+        post = get_object_or_404(
+            Post.objects.only('author_id', 'is_published'), pk=pk
+        )
+        if request.user.id != post.author_id and not post.is_published:
+            raise Http404()
+        page = self.get_comments_page(post, request.GET.get('cursor'))
+        if request.GET.get('format') != 'json':
+            return render(request, 'includes/comment_list.html', {
+                'post': post,
+                'comments': page,
+            })
+        next_url = None
+        if page.has_next():
+            next_url = (
+                reverse('blog:comments', args=(post.id,))
+                + f'?cursor={page.next_cursor}&format=json'
+            )
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.id,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created_at': comment.created_at.isoformat(),
+                }
+                for comment in page
+            ],
+            'next': next_url,
+        })
+
+
 class CommentCreateView(
-    ModelAndFormCommentMixin, UserPassesTestMixin, CreateView
+    ModelAndFormCommentMixin, UserPassesTestMixin, CoordinatedWriteMixin,
+    CreateView
 ):
     """View для отображения страницы создания комментария."""
 
     def test_func(self):
         return self.request.user.is_authenticated
 
+    def post(self, request, *args, **kwargs):
+        # Пост, удалённый после проверки в form_valid, отловит внешний
+        # ключ при коммите. С координатором записи коммит выполняет его
+        # внешняя транзакция, поэтому ошибка ловится здесь, а не в
+        # form_valid.
+        try:
+            return super().post(request, *args, **kwargs)
+        except IntegrityError:
+            raise Http404()
+
     def form_valid(self, form):
-        post = get_object_or_404(Post, pk=self.kwargs['pk'])
+        post_id = self.kwargs['pk']
+        if not Post.objects.filter(pk=post_id).exists():
+            raise Http404()
         comment = form.save(commit=False)
         comment.author = self.request.user
-        comment.post = post
-        comment.save()
-        post.save()
-        return redirect('blog:post_detail', pk=post.pk)
+        comment.post_id = post_id
+        # Вставка комментария и обновление счётчика поста в сигнале идут
+        # одной короткой транзакцией.
+        with transaction.atomic():
+            comment.save()
+        return redirect('blog:post_detail', pk=post_id)
 
 
 class CommentEditView(
-    ModelAndFormCommentMixin, OnlyAuthorMixin,
+    ResolveOnceMixin, ModelAndFormCommentMixin, OnlyAuthorMixin,
     GetSuccessUrlPostMixin, UpdateView
 ):
     """View для отображения страницы редактирования комментария."""
@@ -185,14 +357,13 @@ class CommentEditView(
     template_name = 'blog/comment.html'
 
 
-class CommentDeleteView(OnlyAuthorMixin, DeleteView):
+class CommentDeleteView(ResolveOnceMixin, OnlyAuthorMixin, DeleteView):
     """View для отображения страницы удаления комментария."""
 
     model = Comment
     template_name = 'blog/comment.html'
 
-    def get_post(self):
-        return self.get_object().post
-
     def get_success_url(self):
-        return reverse_lazy('blog:post_detail', args=(self.get_post().id,))
+        return reverse_lazy(
+            'blog:post_detail', args=(self.get_object().post_id,)
+        )
@@ -32,6 +32,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -56,15 +57,76 @@ TEMPLATES = [
     },
 ]
 
+# Компилировать все шаблоны из TEMPLATES_DIR при старте воркера.
+TEMPLATE_WARMUP = False
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    # Реплика только для чтения. Локально её заменяет копия основной
+    # базы, которую обновляет python manage.py sync_sqlite_replica.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db-replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Чтения view с ReplicaReadMixin идут в реплику ALIAS; пользователь,
+# записавший данные, READ_YOUR_WRITES_SECONDS секунд читает из default.
+REPLICA_ROUTING = {
+    'ENABLED': False,
+    'ALIAS': 'replica',
+    'READ_YOUR_WRITES_SECONDS': 10,
+}
+
+# PRAGMA для каждого нового соединения с SQLite (core.db); значение None
+# оставляет настройку SQLite по умолчанию.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'memory',
+}
+
+# Записи из потоков одного процесса выстраиваются в очередь, а отказ
+# из-за блокировки SQLite другим процессом повторяется с паузой.
+WRITE_COORDINATOR = {
+    'ENABLED': False,
+    'DEADLINE': 15.0,
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Кэш страниц для анонимных посетителей. TIMEOUTS задаёт время жизни
+# страницы в секундах; страницы, не указанные в TIMEOUTS, не кэшируются.
+# Кэш ALIAS должен быть общим для всех процессов (см. settings_production):
+# с LocMemCache запись сбрасывает страницы только в своём воркере.
+# Отложенные публикации появляются в кэшированной ленте не позже TIMEOUTS.
+PAGE_CACHE = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'KEY_PREFIX': 'page',
+    'TIMEOUTS': {
+        'index': 60,
+        'category': 300,
+        'profile': 300,
+        'post': 300,
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -104,8 +166,27 @@ LOGIN_REDIRECT_URL = 'blog:index'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Загрузки пишутся во временные файлы и обрываются при превышении
+# UPLOAD_LIMITS['MAX_FILE_SIZE'], изображения проверяются по заголовку.
+FILE_UPLOAD_HANDLERS = ['core.uploads.LimitedUploadHandler']
+
+UPLOAD_LIMITS = {
+    'MAX_FILE_SIZE': 10 * 1024 * 1024,
+    'MAX_IMAGE_PIXELS': 40_000_000,
+}
+
+# Дисковый кэш изображений, уменьшенных по запросу.
+IMAGE_RESIZE = {
+    'CACHE_DIR': BASE_DIR / 'image_cache',
+    'MAX_CACHE_SIZE': 512 * 1024 * 1024,
+}
+
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 DATE_INPUT_FORMATS = ['%m/%d/%Y']
+
+# 'numbered' — страницы с номерами, 'cursor' — переход «новее/старее»
+# без COUNT(*) и OFFSET для больших лент.
+FEED_PAGINATION = 'numbered'
@@ -0,0 +1,51 @@
+"""Настройки для запуска проекта в боевом окружении.
+
+Использование: DJANGO_SETTINGS_MODULE=blogicum.settings_production
+"""
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR, PAGE_CACHE, TEMPLATES_DIR
+
+DEBUG = False
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+            'debug': False,
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+TEMPLATE_WARMUP = True
+
+# Версии областей кэша страниц, которые сбрасываются при записи, должны
+# быть общими для всех воркеров: LocMemCache у каждого процесса свой, и
+# остальные воркеры отдавали бы устаревшие страницы до истечения TIMEOUTS.
+# Файловый кэш общий для воркеров на одной машине; для нескольких машин
+# нужен Memcached или Redis.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'page_cache',
+        'OPTIONS': {'MAX_ENTRIES': 10_000},
+    },
+}
+
+PAGE_CACHE = {**PAGE_CACHE, 'ALIAS': 'pages'}
@@ -1,8 +1,7 @@
-from django.conf import settings
 from django.contrib import admin
-from django.conf.urls.static import static
 from django.urls import include, path
 
+from core.media import media_urlpatterns
 from pages import views
 
 urlpatterns = [
@@ -15,7 +14,7 @@ urlpatterns = [
         views.UserCreateView.as_view(),
         name='registration',
     ),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+] + media_urlpatterns()
 
 handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
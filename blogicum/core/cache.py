@@ -0,0 +1,91 @@
+from functools import partial
+from hashlib import md5
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+PAGE_CACHE_DEFAULTS = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'KEY_PREFIX': 'page',
+    'TIMEOUTS': {},
+}
+
+SITE_SCOPE = 'site'
+INDEX_SCOPE = 'index'
+
+
+def post_scope(pk):
+    return f'post:{pk}'
+
+
+def category_scope(slug):
+    return f'category:{slug}'
+
+
+def profile_scope(username):
+    return f'profile:{username}'
+
+
+def page_cache_settings():
+    return {**PAGE_CACHE_DEFAULTS, **getattr(settings, 'PAGE_CACHE', {})}
+
+
+def get_page_cache():
+    return caches[page_cache_settings()['ALIAS']]
+
+
+def page_cache_timeout(page):
+    """Время жизни страницы в кэше; 0 — страница не кэшируется."""
+    config = page_cache_settings()
+    if not config['ENABLED']:
+        return 0
+    return config['TIMEOUTS'].get(page, 0)
+
+
+def _version_key(scope):
+    return f"{page_cache_settings()['KEY_PREFIX']}:version:{scope}"
+
+
+def get_scope_versions(scopes):
+    """Возвращает текущие версии областей кэша.
+
+    Версия — случайный токен, а не счётчик: если ключ версии вытеснен из
+    кэша, новая версия не совпадёт ни с одной из ранее выданных.
+    """
+    cache = get_page_cache()
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_scopes(*scopes):
+    """Инвалидирует все страницы, зависящие от переданных областей."""
+    get_page_cache().set_many(
+        {_version_key(scope): uuid4().hex for scope in set(scopes)},
+        timeout=None,
+    )
+
+
+def bump_scopes_on_commit(*scopes):
+    """Инвалидирует области после коммита текущей транзакции.
+
+    Сброс внутри транзакции позволил бы параллельному читателю сохранить
+    страницу по ещё не закоммиченным данным под уже новой версией.
+    """
+    transaction.on_commit(partial(bump_scopes, *scopes))
+
+
+def page_cache_key(request, scopes):
+    scopes = (SITE_SCOPE, *scopes)
+    versions = get_scope_versions(scopes)
+    digest = md5(
+        '|'.join((request.get_full_path(), *versions)).encode()
+    ).hexdigest()
+    return f"{page_cache_settings()['KEY_PREFIX']}:{digest}"
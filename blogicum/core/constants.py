@@ -4,4 +4,6 @@ CHAR_LENGTH = 256
 
 PAGINATE_BY = 10
 
+COMMENTS_PER_PAGE = 20
+
 USER = get_user_model()
@@ -0,0 +1,136 @@
+import random
+import threading
+from collections import Counter
+from itertools import count
+from time import monotonic, sleep
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+
+# Значение None отключает PRAGMA: остаётся значение SQLite по умолчанию.
+SQLITE_PRAGMAS_DEFAULTS = {
+    # Читатели не блокируют писателя и видят последний коммит.
+    'journal_mode': 'wal',
+    # В режиме WAL база не повреждается и при NORMAL; при отключении
+    # питания теряются только последние транзакции.
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер в КиБ, а не в страницах.
+    'cache_size': -64 * 1024,
+    'temp_store': 'memory',
+}
+
+
+def sqlite_pragmas():
+    return {
+        **SQLITE_PRAGMAS_DEFAULTS,
+        **getattr(settings, 'SQLITE_PRAGMAS', {}),
+    }
+
+
+def pragma_statements(pragmas):
+    return [
+        f'PRAGMA {name} = {value}'
+        for name, value in pragmas.items()
+        if value is not None
+    ]
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Выставляет PRAGMA из SQLITE_PRAGMAS каждому новому соединению."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(sqlite_pragmas()):
+            cursor.execute(statement)
+
+
+WRITE_COORDINATOR_DEFAULTS = {
+    'ENABLED': False,
+    # Сколько секунд запись может ждать очереди и повторов, включая
+    # busy_timeout каждой попытки.
+    'DEADLINE': 15.0,
+    'BASE_DELAY': 0.02,
+    'MAX_DELAY': 1.0,
+}
+LOCKED_MESSAGES = ('database is locked', 'database table is locked')
+
+
+def write_coordinator_settings():
+    return {
+        **WRITE_COORDINATOR_DEFAULTS,
+        **getattr(settings, 'WRITE_COORDINATOR', {}),
+    }
+
+
+def is_locked_error(error):
+    return any(message in str(error) for message in LOCKED_MESSAGES)
+
+
+class WriteCoordinator:
+    """Очередь записей в БД внутри процесса с повтором при блокировке.
+
+    SQLite допускает одного писателя, поэтому записи из потоков процесса
+    выполняются по одной: остальные ждут своей очереди на блокировке, а
+    не на busy_timeout. Запись, отклонённую из-за блокировки другим
+    процессом, функция повторяет в новой транзакции со случайной
+    экспоненциальной задержкой, пока не выйдет срок DEADLINE.
+    """
+
+    def __init__(self):
+        # RLock: запись, вызванная изнутри другой записи, не ждёт саму себя.
+        self._lock = threading.RLock()
+        self._stats_lock = threading.Lock()
+        self._counters = Counter()
+
+    def stats(self):
+        """Счётчики с запуска процесса: записи, повторы, время ожидания."""
+        with self._stats_lock:
+            return dict(self._counters)
+
+    def _count(self, name, value=1):
+        with self._stats_lock:
+            self._counters[name] += value
+
+    def run(self, func, *args, **kwargs):
+        config = write_coordinator_settings()
+        started = monotonic()
+        deadline = started + config['DEADLINE']
+        if not self._lock.acquire(timeout=config['DEADLINE']):
+            self._count('timeouts')
+            raise OperationalError('database is locked')
+        try:
+            self._count('queue_wait', monotonic() - started)
+            return self._run_with_retries(
+                config, deadline, func, *args, **kwargs
+            )
+        finally:
+            self._lock.release()
+
+    def _run_with_retries(self, config, deadline, func, *args, **kwargs):
+        # Внутри внешней транзакции повтор невозможен: после ошибки
+        # она уже отменена целиком.
+        can_retry = not connection.in_atomic_block
+        for attempt in count():
+            try:
+                with transaction.atomic():
+                    result = func(*args, **kwargs)
+            except OperationalError as error:
+                if not can_retry or not is_locked_error(error):
+                    raise
+                delay = random.uniform(0, min(
+                    config['MAX_DELAY'], config['BASE_DELAY'] * 2 ** attempt
+                ))
+                if monotonic() + delay >= deadline:
+                    self._count('timeouts')
+                    raise
+                self._count('retries')
+                self._count('retry_wait', delay)
+                sleep(delay)
+            else:
+                self._count('writes')
+                return result
+
+
+write_coordinator = WriteCoordinator()
@@ -0,0 +1,86 @@
+from django.db import models
+from django.db.models.fields import files
+from PIL import Image
+
+from .uploads import LimitedImageField
+
+EXIF_ORIENTATION = 0x0112
+# Значения тега Orientation, при которых изображение повёрнуто на 90°.
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def get_oriented_dimensions(file, close=False):
+    """Размеры изображения с учётом поворота из EXIF.
+
+    Читается только заголовок файла, пиксели не декодируются.
+    """
+    position = file.tell()
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            width, height = image.size
+            orientation = image.getexif().get(EXIF_ORIENTATION)
+            if orientation in TRANSPOSED_ORIENTATIONS:
+                width, height = height, width
+            return width, height
+    except (OSError, ValueError, SyntaxError):
+        return None, None
+    finally:
+        if close:
+            file.close()
+        else:
+            file.seek(position)
+
+
+class ImageDimensionField(models.PositiveIntegerField):
+    """Размер изображения в пикселях, который заполняет ImageField."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('null', True)
+        kwargs.setdefault('editable', False)
+        super().__init__(*args, **kwargs)
+
+
+class ImageWidthField(ImageDimensionField):
+    pass
+
+
+class ImageHeightField(ImageDimensionField):
+    pass
+
+
+class ImageFieldFile(files.ImageFieldFile):
+    """Файл изображения, размеры которого учитывают поворот из EXIF."""
+
+    def _get_image_dimensions(self):
+        if not hasattr(self, '_dimensions_cache'):
+            close = self.closed
+            self.open()
+            self._dimensions_cache = get_oriented_dimensions(self, close=close)
+        return self._dimensions_cache
+
+
+class ImageField(models.ImageField):
+    """ImageField, сохраняющий размеры с учётом поворота из EXIF.
+
+    В width_field и height_field попадают размеры изображения так, как его
+    покажет браузер: для снимков, повёрнутых на 90°, они меняются местами.
+    В формах проверяются размер файла и число пикселей (UPLOAD_LIMITS).
+    """
+
+    attr_class = ImageFieldFile
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{'form_class': LimitedImageField, **kwargs})
+
+    def update_dimension_fields(self, instance, force=False, *args, **kwargs):
+        # Для файла, уже сохранённого в хранилище, размеры берутся только
+        # из БД: иначе каждая загруженная строка без размеров открывала бы
+        # файл с диска. Такие строки заполняет fill_image_dimensions.
+        if (
+            not force
+            and self.attname in instance.__dict__
+            and getattr(instance, self.attname)._committed
+        ):
+            return
+        super().update_dimension_fields(instance, force, *args, **kwargs)
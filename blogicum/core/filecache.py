@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+# Время последнего обращения обновляется не чаще раза в час: для LRU такой
+# точности хватает, а на каждом попадании не тратится лишний системный вызов.
+TOUCH_INTERVAL = 3600
+# После вытеснения в кэше остаётся не больше этой доли от предельного размера,
+# чтобы не запускать обход каталога на каждой следующей записи.
+LOW_WATER = 0.9
+
+
+class DiskCache:
+    """Кэш файлов на диске с ограничением размера и вытеснением по LRU.
+
+    Время последнего обращения хранится в mtime файла. Размер кэша
+    отслеживается приблизительно в памяти процесса и уточняется обходом
+    каталога при вытеснении, поэтому несколько процессов могут работать
+    с одним каталогом.
+    """
+
+    def __init__(self, directory, max_size):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._size = None
+
+    def path(self, key, suffix=''):
+        return self.directory / key[:2] / f'{key}{suffix}'
+
+    def get(self, key, suffix=''):
+        """Путь к файлу из кэша или None, если его нет."""
+        path = self.path(key, suffix)
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        if time.time() - mtime > TOUCH_INTERVAL:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                return None
+        return path
+
+    def set(self, key, content, suffix=''):
+        """Атомарно записывает файл в кэш и возвращает путь к нему."""
+        path = self.path(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile(dir=path.parent, delete=False) as file:
+            file.write(content)
+        os.replace(file.name, path)
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(content)
+            if self._size > self.max_size:
+                self._size = self._evict()
+        return path
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for filename in files:
+                try:
+                    stat = os.stat(os.path.join(root, filename))
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, os.path.join(
+                    root, filename
+                )
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_size * LOW_WATER
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
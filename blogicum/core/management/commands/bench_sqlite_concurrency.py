@@ -0,0 +1,160 @@
+import os
+import random
+import sqlite3
+import threading
+from tempfile import TemporaryDirectory
+from time import monotonic, perf_counter
+
+from django.core.management.base import BaseCommand
+
+from core.db import pragma_statements, sqlite_pragmas
+
+N_POSTS = 1000
+N_COMMENTS = 50_000
+# Таймаут, с которым соединяется Django, если не задан OPTIONS['timeout'].
+DJANGO_TIMEOUT = 5.0
+SCHEMA = (
+    'CREATE TABLE post (id INTEGER PRIMARY KEY, text TEXT, '
+    'comment_count INTEGER NOT NULL DEFAULT 0, updated_at REAL)',
+    'CREATE TABLE comment (id INTEGER PRIMARY KEY, post_id INTEGER, '
+    'text TEXT, created_at REAL)',
+    'CREATE INDEX comment_thread_idx ON comment (post_id, created_at)',
+)
+
+
+def create_database(path):
+    rng = random.Random(0)
+    db = sqlite3.connect(path)
+    with db:
+        for statement in SCHEMA:
+            db.execute(statement)
+        db.executemany(
+            'INSERT INTO post (id, text, updated_at) VALUES (?, ?, 0)',
+            ((pk, 'Текст ' * 500) for pk in range(1, N_POSTS + 1)),
+        )
+        db.executemany(
+            'INSERT INTO comment (post_id, text, created_at) VALUES (?, ?, ?)',
+            (
+                (rng.randint(1, N_POSTS), 'Комментарий ' * 10, number)
+                for number in range(N_COMMENTS)
+            ),
+        )
+    db.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite при одновременных '
+        'чтениях и записях с PRAGMA по умолчанию и с SQLITE_PRAGMAS. '
+        'Нагрузка похожа на чтение веток комментариев и добавление '
+        'комментариев; база создаётся во временном каталоге.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5)
+
+    def handle(self, *args, **options):
+        for label, pragmas in (
+            ('по умолчанию', {}),
+            ('SQLITE_PRAGMAS', sqlite_pragmas()),
+        ):
+            with TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                create_database(path)
+                counts = self.run(path, pragmas, options)
+            self.stdout.write(
+                f'{label}: чтений {counts["reads"] / options["seconds"]:.0f}'
+                f' в секунду, записей '
+                f'{counts["writes"] / options["seconds"]:.0f} в секунду, '
+                f'ошибок блокировки {counts["locked"]}, '
+                f'максимальная задержка записи '
+                f'{counts["max_write"] * 1000:.0f} мс'
+            )
+
+    def connect(self, path, pragmas):
+        db = sqlite3.connect(
+            path, timeout=DJANGO_TIMEOUT, isolation_level=None,
+            check_same_thread=False,
+        )
+        for statement in pragma_statements(pragmas):
+            db.execute(statement)
+        return db
+
+    def add_counts(self, **counts):
+        with self.lock:
+            for name, value in counts.items():
+                if name == 'max_write':
+                    value = max(self.counts[name], value)
+                else:
+                    value += self.counts[name]
+                self.counts[name] = value
+
+    def read(self, path, pragmas, deadline, seed):
+        rng = random.Random(seed)
+        db = self.connect(path, pragmas)
+        n_reads = n_locked = 0
+        while monotonic() < deadline:
+            try:
+                db.execute(
+                    'SELECT id, text, created_at FROM comment '
+                    'WHERE post_id = ? ORDER BY created_at LIMIT 20',
+                    (rng.randint(1, N_POSTS),),
+                ).fetchall()
+                n_reads += 1
+            except sqlite3.OperationalError:
+                n_locked += 1
+        db.close()
+        self.add_counts(reads=n_reads, locked=n_locked)
+
+    def write(self, path, pragmas, deadline, seed):
+        rng = random.Random(seed)
+        db = self.connect(path, pragmas)
+        n_writes = n_locked = 0
+        slowest = 0
+        while monotonic() < deadline:
+            post_id = rng.randint(1, N_POSTS)
+            started = perf_counter()
+            try:
+                db.execute('BEGIN')
+                db.execute(
+                    'INSERT INTO comment (post_id, text, created_at) '
+                    'VALUES (?, ?, ?)',
+                    (post_id, 'Комментарий', started),
+                )
+                db.execute(
+                    'UPDATE post SET comment_count = comment_count + 1,'
+                    ' updated_at = ? WHERE id = ?',
+                    (started, post_id),
+                )
+                db.execute('COMMIT')
+                n_writes += 1
+            except sqlite3.OperationalError:
+                db.execute('ROLLBACK')
+                n_locked += 1
+            slowest = max(slowest, perf_counter() - started)
+        db.close()
+        self.add_counts(writes=n_writes, locked=n_locked, max_write=slowest)
+
+    def run(self, path, pragmas, options):
+        self.counts = {'reads': 0, 'writes': 0, 'locked': 0, 'max_write': 0}
+        self.lock = threading.Lock()
+        deadline = monotonic() + options['seconds']
+        threads = [
+            threading.Thread(
+                target=self.read, args=(path, pragmas, deadline, number)
+            )
+            for number in range(options['readers'])
+        ] + [
+            threading.Thread(
+                target=self.write,
+                args=(path, pragmas, deadline, -number - 1),
+            )
+            for number in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.counts
@@ -0,0 +1,107 @@
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template.backends.django import DjangoTemplates
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils.timezone import now
+
+from blog.forms import CommentForm
+from blog.models import Category, Comment, Location, Post
+from core.constants import PAGINATE_BY, USER
+
+DEV_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+CACHED_LOADERS = [('django.template.loaders.cached.Loader', DEV_LOADERS)]
+
+
+def build_engine(loaders, debug):
+    options = settings.TEMPLATES[0]['OPTIONS']
+    return DjangoTemplates({
+        'NAME': 'bench',
+        'DIRS': [settings.TEMPLATES_DIR],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'context_processors': options.get('context_processors', []),
+            'loaders': loaders,
+            'debug': debug,
+        },
+    })
+
+
+def build_contexts():
+    """Контексты страниц из несохранённых объектов: БД не нужна."""
+    moment = now()
+    author = USER(id=1, username='author')
+    category = Category(
+        id=1, title='Путешествия', slug='travel', is_published=True,
+        updated_at=moment,
+    )
+    location = Location(
+        id=1, name='Москва', is_published=True, updated_at=moment
+    )
+    posts = [
+        Post(
+            id=pk, title=f'Пост {pk}', text='Текст публикации ' * 50,
+            pub_date=moment, updated_at=moment, is_published=True,
+            author=author, category=category, location=location,
+            comment_count=pk,
+        )
+        for pk in range(1, PAGINATE_BY + 1)
+    ]
+    comments = [
+        Comment(
+            id=pk, text='Комментарий ' * 10, created_at=moment,
+            author=author, post=posts[0],
+        )
+        for pk in range(1, 21)
+    ]
+    return {
+        'blog/index.html': {
+            'page_obj': Paginator(posts, PAGINATE_BY).page(1),
+        },
+        'blog/detail.html': {
+            'post': posts[0],
+            'form': CommentForm(),
+            'comments': comments,
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время рендеринга шаблонов с загрузчиками режима '
+        'разработки и с кэширующим загрузчиком.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        profiles = (
+            ('до (APP_DIRS, debug)', build_engine(DEV_LOADERS, True)),
+            ('после (cached.Loader)', build_engine(CACHED_LOADERS, False)),
+        )
+        dummy_cache = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+            }
+        }
+        with override_settings(CACHES=dummy_cache):
+            for name, context in build_contexts().items():
+                for label, engine in profiles:
+                    started = perf_counter()
+                    for _ in range(iterations):
+                        engine.get_template(name).render(context, request)
+                    elapsed = (perf_counter() - started) / iterations
+                    self.stdout.write(
+                        f'{name:<20} {label:<24} {elapsed * 1000:8.3f} мс'
+                    )
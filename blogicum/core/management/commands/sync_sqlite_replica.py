@@ -0,0 +1,45 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.routers import replica_routing_settings
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файл реплики для локальной '
+        'проверки чтения из реплики. Копирование идёт через backup API '
+        'SQLite, поэтому сайт может работать во время копирования.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=replica_routing_settings()['ALIAS'],
+            help='Алиас базы, в которую копируются данные.',
+        )
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        if alias not in connections.databases or alias == DEFAULT_DB_ALIAS:
+            raise CommandError(f'Неизвестная база реплики: {alias}.')
+        source, target = (
+            connections[name].settings_dict
+            for name in (DEFAULT_DB_ALIAS, alias)
+        )
+        if not all(
+            database['ENGINE'] == 'django.db.backends.sqlite3'
+            for database in (source, target)
+        ):
+            raise CommandError('Команда копирует только базы SQLite.')
+        src = sqlite3.connect(source['NAME'])
+        dst = sqlite3.connect(target['NAME'])
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+        self.stdout.write(self.style.SUCCESS(
+            f'База {source["NAME"]} скопирована в {target["NAME"]}.'
+        ))
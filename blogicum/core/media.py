@@ -0,0 +1,216 @@
+import mimetypes
+import os
+import re
+from pathlib import PurePosixPath
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse,
+)
+from django.urls import re_path
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .storage import is_hashed_name
+
+MEDIA_SERVING_DEFAULTS = {
+    # None — файл отдаёт Django, 'x-accel-redirect' — nginx,
+    # 'x-sendfile' — Apache с mod_xsendfile или lighttpd.
+    'OFFLOAD': None,
+    # Внутренний location nginx, из которого отдаётся MEDIA_ROOT.
+    'ACCEL_PREFIX': '/protected-media/',
+    # Внутренний location для дискового кэша IMAGE_RESIZE['CACHE_DIR'].
+    'RESIZE_ACCEL_PREFIX': '/protected-resized/',
+    'MAX_AGE': 60 * 60,
+    'IMMUTABLE_MAX_AGE': 365 * 24 * 60 * 60,
+}
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+RENDITION_DIR_RE = re.compile(r'^\d+w$')
+
+
+def media_serving_settings():
+    return {
+        **MEDIA_SERVING_DEFAULTS,
+        **getattr(settings, 'MEDIA_SERVING', {}),
+    }
+
+
+def is_immutable(name):
+    """Файлы с хешем содержимого в имени и их уменьшенные копии.
+
+    Под таким именем всегда лежат одни и те же байты, поэтому браузер и
+    прокси могут хранить их сколько угодно без перепроверки.
+    """
+    path = PurePosixPath(name)
+    if RENDITION_DIR_RE.match(path.parent.name):
+        path = path.parent.parent / path.name
+    return is_hashed_name(str(path))
+
+
+def parse_range(header, size):
+    """Диапазон из заголовка Range в виде (начало, конец) включительно.
+
+    Поддерживается один диапазон байтов; для остальных заголовков
+    возвращается None, и файл отдаётся целиком. Для диапазона, который
+    целиком лежит за концом файла, возвращается пустой кортеж.
+    """
+    match = RANGE_RE.match(header)
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        length = int(last)
+        if not length or not size:
+            return ()
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        return ()
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+def iter_file(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@require_safe
+def serve_media(request, path):
+    """View для выдачи загруженных файлов из MEDIA_ROOT.
+
+    Поддерживает условные запросы и запросы диапазонов. Если настроен
+    MEDIA_SERVING['OFFLOAD'], сами байты отдаёт фронтовой веб-сервер,
+    а воркер только проверяет запрос и выставляет заголовки.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    config = media_serving_settings()
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = build_file_response(
+            request, path, full_path, stat.st_size, etag, last_modified,
+            config,
+        )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if is_immutable(path):
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=config['IMMUTABLE_MAX_AGE'],
+            immutable=True,
+        )
+    else:
+        patch_cache_control(response, public=True, max_age=config['MAX_AGE'])
+    return response
+
+
+def offload_response(prefix, path, full_path, content_type, config):
+    """Ответ, передающий отдачу файла фронтовому веб-серверу.
+
+    prefix — внутренний location nginx, path — путь файла внутри него.
+    Если MEDIA_SERVING['OFFLOAD'] не задан, возвращает None.
+    """
+    if config['OFFLOAD'] == 'x-accel-redirect':
+        # Диапазоны и передачу файла берёт на себя nginx.
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = (
+            prefix.rstrip('/') + '/' + quote(path)
+        )
+        return response
+    if config['OFFLOAD'] == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = str(full_path)
+        return response
+    return None
+
+
+def build_file_response(
+    request, path, full_path, size, etag, last_modified, config
+):
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    response = offload_response(
+        config['ACCEL_PREFIX'], path, full_path, content_type, config
+    )
+    if response is not None:
+        return response
+
+    start, end = 0, size - 1
+    byte_range = None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if 'HTTP_RANGE' in request.META and if_range in (
+        None, etag, http_date(last_modified)
+    ):
+        byte_range = parse_range(request.META['HTTP_RANGE'], size)
+    if byte_range == ():
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    length = size
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+    elif not byte_range:
+        # Файл целиком FileResponse отдаёт через wsgi.file_wrapper,
+        # то есть sendfile(), если его поддерживает сервер приложений.
+        response = FileResponse(
+            open(full_path, 'rb'), content_type=content_type
+        )
+    else:
+        response = StreamingHttpResponse(
+            iter_file(full_path, start, length), content_type=content_type
+        )
+    if byte_range:
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = length
+    response['Accept-Ranges'] = 'bytes'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
+
+
+def media_urlpatterns():
+    """Маршрут для файлов из MEDIA_ROOT, подключается последним.
+
+    Путь должен заканчиваться именем файла с расширением: иначе маршрут
+    перехватывал бы адреса страниц без завершающего слэша, которые
+    CommonMiddleware перенаправляет на адрес со слэшем.
+    """
+    prefix = re.escape(settings.MEDIA_URL.lstrip('/'))
+    return [
+        re_path(
+            rf'^{prefix}(?P<path>(?:[^/]+/)*[^/]+\.[^/]+)$',
+            serve_media,
+            name='media',
+        ),
+    ]
@@ -1,10 +1,36 @@
+from calendar import timegm
+from hashlib import md5
+
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.urls import reverse_lazy
-from django.http import Http404
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
 
 from blog.models import Category, Post, Comment
 from blog.forms import CommentForm
+from .cache import get_page_cache, page_cache_key, page_cache_timeout
+from .constants import COMMENTS_PER_PAGE
+from .db import write_coordinator, write_coordinator_settings
+from .paginator import CursorPaginator, ForwardCursorPaginator
+from .routers import read_from_default
+
+
+class ResolveOnceMixin:
+    """Миксин, получающий каждый объект не более одного раза за запрос."""
+
+    def resolve(self, name, resolver):
+        resolved = self.__dict__.setdefault('_resolved_objects', {})
+        if name not in resolved:
+            resolved[name] = resolver()
+        return resolved[name]
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        return self.resolve('object', super().get_object)
 
 
 class OnlyAuthorMixin(UserPassesTestMixin):
@@ -12,7 +38,7 @@ class OnlyAuthorMixin(UserPassesTestMixin):
 
     def test_func(self):
         obj = self.get_object()
-        return obj.author == self.request.user
+        return obj.author_id == self.request.user.id
 
 
 class CategoryPublishedMixin:
@@ -28,10 +54,47 @@ class CategoryPublishedMixin:
         return super().dispatch(request, *args, **kwargs)
 
 
+class CoordinatedWriteMixin:
+    """Миксин, проводящий обработку POST-запроса через координатор записи.
+
+    Включается настройкой WRITE_COORDINATOR['ENABLED']. Форма при повторе
+    создаётся и проверяется заново, поэтому частично выполненная попытка
+    не оставляет следов.
+    """
+
+    def post(self, request, *args, **kwargs):
+        if not write_coordinator_settings()['ENABLED']:
+            return super().post(request, *args, **kwargs)
+        return write_coordinator.run(super().post, request, *args, **kwargs)
+
+
+class ReplicaReadMixin:
+    """Миксин view только для чтения: запросы к БД идут в реплику.
+
+    Переключение выполняет core.routers.ReplicaRoutingMiddleware при
+    включённой настройке REPLICA_ROUTING['ENABLED'].
+    """
+
+    replica_reads = True
+
+
 class ModelPostMixin:
     """Миксин модели Post."""
 
     model = Post
+    queryset = Post.objects.select_related('author', 'category', 'location')
+
+
+class CommentPageMixin:
+    """Миксин постраничного вывода комментариев поста по курсору."""
+
+    comments_per_page = COMMENTS_PER_PAGE
+
+    def get_comments_page(self, post, cursor=None):
+        paginator = ForwardCursorPaginator(
+            post.comment.thread(), self.comments_per_page
+        )
+        return paginator.page(cursor)
 
 
 class ModelAndFormCommentMixin:
@@ -55,3 +118,143 @@ class GetSuccessUrlProfileMixin:
     def get_success_url(self):
         username = self.request.user.username
         return reverse_lazy('blog:profile', args=(username,))
+
+
+class CursorPaginationMixin:
+    """Миксин постраничного вывода ленты по курсору вместо номера страницы.
+
+    Режим включается настройкой FEED_PAGINATION = 'cursor'; по умолчанию
+    остаётся нумерованная пагинация.
+    """
+
+    cursor_kwarg = 'cursor'
+
+    def paginate_queryset(self, queryset, page_size):
+        if getattr(settings, 'FEED_PAGINATION', 'numbered') != 'cursor':
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size)
+        page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class AnonymousPageCacheMixin:
+    """Миксин кэширования страницы целиком для анонимных посетителей.
+
+    Ключ страницы включает версии областей из get_cache_scopes(), которые
+    сбрасываются сигналами при изменении моделей.
+    """
+
+    page_cache_name = None
+    page_cache_headers = (
+        'Content-Type', 'ETag', 'Last-Modified', 'Cache-Control'
+    )
+
+    def get_cache_scopes(self):
+        return ()
+
+    def dispatch(self, request, *args, **kwargs):
+        timeout = page_cache_timeout(self.page_cache_name)
+        if (
+            not timeout
+            or request.method not in ('GET', 'HEAD')
+            or request.user.is_authenticated
+        ):
+            return super().dispatch(request, *args, **kwargs)
+
+        cache = get_page_cache()
+        key = page_cache_key(request, self.get_cache_scopes())
+        cached = cache.get(key)
+        if cached is not None:
+            content, headers = cached
+            response = HttpResponse(content)
+            for header, value in headers.items():
+                response[header] = value
+            return get_conditional_response(
+                request,
+                etag=headers.get('ETag'),
+                last_modified=parse_http_date_safe(
+                    headers.get('Last-Modified')
+                ),
+                response=response,
+            )
+
+        def store(response):
+            if response.status_code == 200 and not response.cookies:
+                headers = {
+                    header: response[header]
+                    for header in self.page_cache_headers
+                    if response.has_header(header)
+                }
+                cache.set(key, (response.content, headers), timeout)
+
+        # Страница ляжет в кэш под текущей версией, сброшенной после
+        # записи, поэтому рендерится не из реплики, которая может ещё не
+        # содержать эту запись.
+        read_from_default()
+        response = super().dispatch(request, *args, **kwargs)
+        if hasattr(response, 'add_post_render_callback'):
+            response.add_post_render_callback(store)
+        elif not response.streaming:
+            store(response)
+        return response
+
+
+class ConditionalGetMixin:
+    """Миксин условных GET-запросов: отвечает 304, если страница не менялась.
+
+    Валидаторы строятся по той же странице ленты, которую затем выводит
+    шаблон: подсчёт и выборка выполняются один раз за запрос, а при
+    совпадении валидаторов не выполняется рендеринг шаблона.
+    """
+
+    def paginate_queryset(self, queryset, page_size):
+        if '_paginated' not in self.__dict__:
+            self._paginated = super().paginate_queryset(queryset, page_size)
+        return self._paginated
+
+    def get_validators(self):
+        """Возвращает (состояние страницы, время изменения) или None."""
+        queryset = self.get_queryset()
+        paginator, page, posts, _ = self.paginate_queryset(
+            queryset, self.get_paginate_by(queryset)
+        )
+        stamps = [
+            (
+                post.pk,
+                post.comment_count,
+                post.author.username,
+                post.updated_at,
+                post.category and post.category.updated_at,
+                post.location and post.location.updated_at,
+            )
+            for post in posts
+        ]
+        # Last-Modified у ленты не выставляется: максимум updated_at
+        # карточек не растёт, когда пост удалён, снят с публикации или
+        # ушёл со страницы, и запрос только с If-Modified-Since получил
+        # бы 304 для изменившейся страницы. Такие изменения видит ETag.
+        return (getattr(paginator, 'count', None), stamps), None
+
+    def get(self, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is None:
+            return super().get(request, *args, **kwargs)
+
+        state, last_modified = validators
+        digest = md5(repr((request.user.pk, state)).encode()).hexdigest()
+        etag = f'W/"{digest}"'
+        if last_modified is not None:
+            last_modified = timegm(last_modified.utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        if request.user.is_authenticated:
+            patch_cache_control(response, no_cache=True, private=True)
+        else:
+            patch_cache_control(response, no_cache=True)
+        return response
@@ -0,0 +1,150 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.db.models import Q
+from django.http import Http404
+from django.utils.dateparse import parse_datetime
+
+OLDER = 'o'
+NEWER = 'n'
+
+
+def encode_cursor(direction, value, pk):
+    """Упаковывает позицию в ленте в непрозрачный токен."""
+    raw = f'{direction}{value.isoformat()}|{pk}'.encode()
+    return urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковывает токен; для повреждённого токена возвращает 404."""
+    try:
+        raw = urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        direction, rest = raw[0], raw[1:]
+        value, pk = rest.rsplit('|', 1)
+        value, pk = parse_datetime(value), int(pk)
+    except (BinasciiError, UnicodeDecodeError, IndexError, ValueError):
+        raise Http404('Некорректный курсор.')
+    if direction not in (OLDER, NEWER) or value is None:
+        raise Http404('Некорректный курсор.')
+    return direction, value, pk
+
+
+class CursorPage:
+    """Страница ленты, полученная поиском по ключу без COUNT и OFFSET."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинатор по паре (field, pk) в порядке «от новых к старым»."""
+
+    def __init__(self, queryset, per_page, field='pub_date'):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.field = field
+
+    def _after(self, direction, value, pk):
+        lookup = 'lt' if direction == OLDER else 'gt'
+        return self.queryset.filter(
+            Q(**{f'{self.field}__{lookup}': value})
+            | Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def _cursor(self, direction, post):
+        return encode_cursor(direction, getattr(post, self.field), post.pk)
+
+    def page(self, cursor=None):
+        newest_first = (f'-{self.field}', '-pk')
+        if not cursor:
+            direction = OLDER
+            queryset = self.queryset.order_by(*newest_first)
+        else:
+            direction, value, pk = decode_cursor(cursor)
+            queryset = self._after(direction, value, pk)
+            if direction == OLDER:
+                queryset = queryset.order_by(*newest_first)
+            else:
+                queryset = queryset.order_by(self.field, 'pk')
+
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+
+        if direction == NEWER:
+            if not has_more:
+                return self.page()
+            object_list.reverse()
+        if not object_list:
+            return CursorPage(object_list, self, None, None)
+
+        has_older = has_more if direction == OLDER else True
+        has_newer = bool(cursor) if direction == OLDER else has_more
+        return CursorPage(
+            object_list,
+            self,
+            self._cursor(OLDER, object_list[-1]) if has_older else None,
+            self._cursor(NEWER, object_list[0]) if has_newer else None,
+        )
+
+
+class ForwardCursorPaginator:
+    """Пагинатор по паре (field, pk) в порядке «от старых к новым».
+
+    Только вперёд: следующая страница начинается после последнего
+    объекта предыдущей, поэтому добавленные тем временем объекты не
+    сдвигают ленту и не дают повторов.
+    """
+
+    def __init__(self, queryset, per_page, field='created_at'):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.field = field
+
+    def page(self, cursor=None):
+        queryset = self.queryset
+        if cursor:
+            direction, value, pk = decode_cursor(cursor)
+            if direction != NEWER:
+                raise Http404('Некорректный курсор.')
+            # Условие >= позволяет начать чтение индекса с нужного места,
+            # а не отбрасывать строки до курсора одну за другой.
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__gt': value})
+                | Q(**{self.field: value, 'pk__gt': pk}),
+                **{f'{self.field}__gte': value},
+            )
+        object_list = list(
+            queryset.order_by(self.field, 'pk')[:self.per_page + 1]
+        )
+        next_cursor = None
+        if len(object_list) > self.per_page:
+            object_list = object_list[:self.per_page]
+            last = object_list[-1]
+            next_cursor = encode_cursor(
+                NEWER, getattr(last, self.field), last.pk
+            )
+        return CursorPage(object_list, self, next_cursor, None)
@@ -0,0 +1,114 @@
+import threading
+from time import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_ROUTING_DEFAULTS = {
+    'ENABLED': False,
+    'ALIAS': 'replica',
+    # Сколько секунд после своей записи пользователь читает из основной
+    # базы, а не из реплики, которая может отставать.
+    'READ_YOUR_WRITES_SECONDS': 10,
+    'SESSION_KEY': '_db_written_at',
+}
+
+_state = threading.local()
+
+
+def replica_routing_settings():
+    return {
+        **REPLICA_ROUTING_DEFAULTS,
+        **getattr(settings, 'REPLICA_ROUTING', {}),
+    }
+
+
+def is_routing_enabled(config):
+    return config['ENABLED'] and config['ALIAS'] in settings.DATABASES
+
+
+def wrote_recently(request, config):
+    session = getattr(request, 'session', None)
+    if session is None:
+        return False
+    written_at = session.get(config['SESSION_KEY'])
+    return (
+        written_at is not None
+        and time() - written_at < config['READ_YOUR_WRITES_SECONDS']
+    )
+
+
+def read_from_default():
+    """Отправляет чтения до конца текущего запроса в основную базу."""
+    _state.read_alias = None
+
+
+class ReplicaRouter:
+    """Роутер, отправляющий чтения view только для чтения в реплику.
+
+    Алиас для чтения выбирает ReplicaRoutingMiddleware на время запроса;
+    вне таких запросов и для любых записей используется основная база.
+    """
+
+    def db_for_read(self, model, **hints):
+        return getattr(_state, 'read_alias', None)
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        # Явно, иначе объект, прочитанный из реплики, сохранялся бы в неё.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_routing_settings()['ALIAS']}
+        if {obj1._state.db, obj2._state.db} <= aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема и данные попадают в реплику вместе с копией основной базы.
+        if db == replica_routing_settings()['ALIAS']:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Middleware, выбирающий базу для чтения на время запроса.
+
+    GET- и HEAD-запросы к view с ReplicaReadMixin читают из реплики,
+    если пользователь не записывал данные последние
+    READ_YOUR_WRITES_SECONDS секунд. Запрос, в котором была запись,
+    отмечается в сессии пользователя.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.read_alias = None
+        _state.wrote = False
+        config = replica_routing_settings()
+        if not is_routing_enabled(config):
+            # Без реплики отметка в сессии не нужна, а её сохранение
+            # было бы лишней записью в django_session.
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            # Шаблон рендерится внутри get_response, поэтому его запросы
+            # тоже идут в реплику.
+            _state.read_alias = None
+        if _state.wrote and request.user.is_authenticated:
+            request.session[config['SESSION_KEY']] = time()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        config = replica_routing_settings()
+        view_class = getattr(view_func, 'view_class', None)
+        if (
+            is_routing_enabled(config)
+            and request.method in ('GET', 'HEAD')
+            and getattr(view_class, 'replica_reads', False)
+            # Сессия читается здесь, до переключения, из основной базы.
+            and not wrote_recently(request, config)
+        ):
+            _state.read_alias = config['ALIAS']
@@ -0,0 +1,84 @@
+import os
+import re
+from hashlib import sha256
+from pathlib import PurePosixPath
+from tempfile import NamedTemporaryFile
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+SHARD_LEVELS = 2
+SHARD_WIDTH = 2
+HASHED_NAME_RE = (
+    r'(^|/)' + r'[0-9a-f]{%d}/' % SHARD_WIDTH * SHARD_LEVELS
+    + r'[0-9a-f]{64}(\.[^/]*)?$'
+)
+
+
+def is_hashed_name(name):
+    return re.search(HASHED_NAME_RE, name) is not None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранилище, в котором имя файла — SHA-256 его содержимого.
+
+    Файлы раскладываются по вложенным каталогам по первым символам хеша:
+    post_images/3f/a2/3fa2….jpg. Одинаковые загрузки получают одно имя
+    и хранятся на диске в одном экземпляре.
+    """
+
+    def hashed_name(self, name, content):
+        digest = sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        hexdigest = digest.hexdigest()
+        shards = (
+            hexdigest[level * SHARD_WIDTH:(level + 1) * SHARD_WIDTH]
+            for level in range(SHARD_LEVELS)
+        )
+        path = PurePosixPath(name)
+        return str(PurePosixPath(
+            path.parent, *shards, hexdigest + path.suffix.lower()
+        ))
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if max_length is not None and len(name) > max_length:
+            raise SuspiciousFileOperation(
+                f'Имя файла {name} длиннее {max_length} символов.'
+            )
+        try:
+            # На существующий файл сейчас появится новая ссылка: обновляем
+            # время изменения, чтобы collect_orphaned_media его не удалил.
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            self._save(name, content)
+        return name
+
+    def _save(self, name, content):
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(
+            directory,
+            mode=self.directory_permissions_mode or 0o777,
+            exist_ok=True,
+        )
+        # Одновременная загрузка того же файла запишет те же байты, поэтому
+        # файл не блокируется, а атомарно подменяется.
+        with NamedTemporaryFile(dir=directory, delete=False) as file:
+            for chunk in content.chunks():
+                file.write(chunk)
+        os.chmod(file.name, self.file_permissions_mode or 0o644)
+        os.replace(file.name, full_path)
+        return name
+
+
+post_image_storage = ContentAddressedStorage()
@@ -0,0 +1,113 @@
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from PIL import Image
+
+UPLOAD_LIMITS_DEFAULTS = {
+    'MAX_FILE_SIZE': 10 * 1024 * 1024,
+    'MAX_IMAGE_PIXELS': 40_000_000,
+}
+
+
+def upload_limits():
+    return {
+        **UPLOAD_LIMITS_DEFAULTS,
+        **getattr(settings, 'UPLOAD_LIMITS', {}),
+    }
+
+
+class RejectedUpload(UploadedFile):
+    """Загрузка, оборванная из-за превышения размера: данных в ней нет."""
+
+    exceeded_limit = True
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузки во временные файлы и обрывает слишком большие.
+
+    Файл любого размера не держится в памяти целиком. Как только он
+    превышает MAX_FILE_SIZE, временный файл удаляется, а остаток поля
+    читается из запроса вхолостую; вместо файла форма получает
+    RejectedUpload и показывает ошибку.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.max_size = upload_limits()['MAX_FILE_SIZE']
+        self.received = 0
+        self.exceeded_limit = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received = start + len(raw_data)
+        if self.exceeded_limit:
+            return None
+        if self.received > self.max_size:
+            self.exceeded_limit = True
+            self.file.close()
+            return None
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if self.exceeded_limit:
+            return RejectedUpload(
+                name=self.file_name,
+                content_type=self.content_type,
+                size=self.received,
+                charset=self.charset,
+                content_type_extra=self.content_type_extra,
+            )
+        return super().file_complete(file_size)
+
+
+class LimitedImageField(forms.ImageField):
+    """ImageField с ограничением размера файла и числа пикселей.
+
+    Размеры читаются из заголовка, поэтому слишком большое изображение
+    отклоняется до того, как Pillow начнёт его разбирать.
+    """
+
+    default_error_messages = {
+        'file_too_large': 'Размер файла не должен превышать %(limit)s МБ.',
+        'too_many_pixels': (
+            'Изображение не должно быть больше %(limit)s мегапикселей.'
+        ),
+    }
+
+    def to_python(self, data):
+        if data in self.empty_values:
+            return super().to_python(data)
+        limits = upload_limits()
+        if (
+            getattr(data, 'exceeded_limit', False)
+            or data.size > limits['MAX_FILE_SIZE']
+        ):
+            raise ValidationError(
+                self.error_messages['file_too_large'],
+                code='file_too_large',
+                params={'limit': limits['MAX_FILE_SIZE'] // (1024 * 1024)},
+            )
+        if hasattr(data, 'temporary_file_path'):
+            source = data.temporary_file_path()
+        else:
+            source = data
+        try:
+            with Image.open(source) as image:
+                pixels = image.width * image.height
+        except Image.DecompressionBombError:
+            # Больше даже встроенного предела Pillow.
+            pixels = None
+        except Exception:
+            # Нераспознанный файл отклонит проверка ImageField.
+            pixels = 0
+        finally:
+            if source is data:
+                data.seek(0)
+        if pixels is None or pixels > limits['MAX_IMAGE_PIXELS']:
+            raise ValidationError(
+                self.error_messages['too_many_pixels'],
+                code='too_many_pixels',
+                params={'limit': limits['MAX_IMAGE_PIXELS'] // 1_000_000},
+            )
+        return super().to_python(data)
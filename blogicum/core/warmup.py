@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.template import engines
+
+
+def warm_up_templates():
+    """Компилирует все шаблоны проекта, заполняя кэш загрузчика.
+
+    Имеет смысл только с кэширующим загрузчиком: тогда первые запросы
+    воркера не тратят время на чтение и разбор шаблонов.
+    """
+    templates_dir = settings.TEMPLATES_DIR
+    names = sorted(
+        path.relative_to(templates_dir).as_posix()
+        for path in templates_dir.rglob('*.html')
+    )
+    for engine in engines.all():
+        for name in names:
+            engine.get_template(name)
+    return names
@@ -0,0 +1,102 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedExecutor:
+    """Пул потоков для фоновых задач с ограниченной очередью.
+
+    Задача с ключом, который уже стоит в очереди, повторно не ставится.
+    Если очередь заполнена, submit возвращает False, и задачу нужно
+    выполнить позже другим способом. Потоки создаются при первой задаче.
+    """
+
+    def __init__(self, name, max_workers, max_queue):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+        self._futures = {}
+
+    @property
+    def depth(self):
+        """Число задач в очереди, включая выполняемые."""
+        return len(self._futures)
+
+    def submit(self, key, fn, *args):
+        with self._lock:
+            if key in self._futures:
+                return True
+            if len(self._futures) >= self.max_workers + self.max_queue:
+                logger.warning(
+                    'Очередь %s заполнена (%d задач), задача %s отложена',
+                    self.name, len(self._futures), key,
+                )
+                return False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.name,
+                )
+            future = self._executor.submit(self._run, fn, *args)
+            self._futures[key] = future
+        future.add_done_callback(lambda _: self._forget(key))
+        logger.debug('Очередь %s: %d задач', self.name, self.depth)
+        return True
+
+    def _run(self, fn, *args):
+        try:
+            return fn(*args)
+        except Exception:
+            logger.exception('Ошибка в фоновой задаче %s', self.name)
+        finally:
+            # Соединения с БД в потоках пула не переиспользуются между
+            # задачами и иначе остались бы открытыми.
+            connections.close_all()
+
+    def _forget(self, key):
+        with self._lock:
+            self._futures.pop(key, None)
+
+    def wait(self, timeout=None):
+        """Дожидается выполнения задач, поставленных к этому моменту."""
+        with self._lock:
+            futures = list(self._futures.values())
+        wait_futures(futures, timeout=timeout)
+
+
+class SingleFlight:
+    """Объединяет одновременные вызовы с одинаковым ключом.
+
+    Функция выполняется один раз, остальные вызовы в этом процессе
+    дожидаются её результата или исключения.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args):
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = Future()
+        if not is_leader:
+            return call.result()
+        try:
+            result = fn(*args)
+        except BaseException as error:
+            call.set_exception(error)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -7,15 +7,16 @@ from django.views.generic.edit import CreateView
 from django.shortcuts import render
 
 from core.constants import USER
+from core.mixins import ReplicaReadMixin
 
 
-class AboutTemplateView(TemplateView):
+class AboutTemplateView(ReplicaReadMixin, TemplateView):
     """View для отображения страницы с информацией о проекте."""
 
     template_name = 'pages/about.html'
 
 
-class RulesTemplateView(TemplateView):
+class RulesTemplateView(ReplicaReadMixin, TemplateView):
     """View для отображения страницы с правилами пользования проектом."""
 
     template_name = 'pages/rules.html'
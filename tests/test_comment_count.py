@@ -0,0 +1,139 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        mixer, user, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.comment_count == 0, (
+        "Убедитесь, что у нового поста счётчик комментариев равен нулю."
+    )
+
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Текст"})
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что создание комментария увеличивает счётчик"
+        " комментариев поста."
+    )
+
+    comment = post.comment.get()
+    comment.author = user
+    comment.save()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что удаление комментария уменьшает счётчик"
+        " комментариев поста."
+    )
+
+
+def test_comment_write_does_not_rewrite_post(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    with CaptureQueriesContext(connection) as ctx:
+        response = user_client.post(
+            f"/posts/{post.id}/comment/", data={"text": "Текст"}
+        )
+    assert response.status_code == 302
+    post_updates = [
+        query["sql"] for query in ctx.captured_queries
+        if query["sql"].startswith('UPDATE "blog_post"')
+    ]
+    assert len(post_updates) == 1 and '"text"' not in post_updates[0], (
+        "Убедитесь, что при добавлении комментария пост не пересохраняется"
+        " целиком, а обновляются только счётчик и время изменения."
+    )
+    missing = user_client.post("/posts/0/comment/", data={"text": "Текст"})
+    assert missing.status_code == 404
+
+
+def test_stale_post_save_keeps_comment_count(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post)
+    post.title = "Новый заголовок"
+    post.save()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что сохранение поста не перезаписывает счётчик"
+        " комментариев устаревшим значением."
+    )
+
+
+def test_comment_moved_and_cascade_deleted(mixer, user, published_category):
+    first_post, second_post = mixer.cycle(2).blend(
+        "blog.Post", category=published_category
+    )
+    comment = mixer.blend("blog.Comment", post=first_post, author=user)
+    comment.post = second_post
+    comment.save()
+    first_post.refresh_from_db()
+    second_post.refresh_from_db()
+    assert (first_post.comment_count, second_post.comment_count) == (0, 1)
+
+    user.delete()
+    second_post.refresh_from_db()
+    assert second_post.comment_count == 0, (
+        "Убедитесь, что каскадное удаление комментариев уменьшает счётчик"
+        " комментариев поста."
+    )
+
+
+def test_recount_comments_fixes_drift(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=42)
+
+    call_command("recount_comments", batch_size=1)
+
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что команда `recount_comments` восстанавливает"
+        " счётчики комментариев."
+    )
+
+
+def test_drifted_counter_does_not_go_negative(
+        mixer, user, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    type(post).objects.filter(pk=post.pk).update(comment_count=0)
+    response = user_client.post(
+        f"/posts/{post.id}/delete_comment/{comment.id}/"
+    )
+    assert response.status_code == 302
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        "Убедитесь, что разошедшийся с данными счётчик комментариев"
+        " не уходит ниже нуля."
+    )
+
+
+def test_raw_loaded_comments_are_counted(
+        mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    Comment = post.comment.model
+    comment = Comment(
+        post=post, author=user, text="Текст", created_at=timezone.now()
+    )
+    comment.save_base(raw=True)
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+    post.comment_count = 0
+    post.save_base(raw=True)
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что после loaddata счётчики комментариев"
+        " соответствуют загруженным комментариям."
+    )
@@ -0,0 +1,121 @@
+from datetime import timedelta
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db]
+
+PER_PAGE = 3
+
+
+@pytest.fixture
+def many_comments(mixer, user, post_with_published_location):
+    # Половина комментариев с одинаковым временем: курсор должен
+    # различать их по id.
+    same_time = timezone.now() - timedelta(hours=1)
+    comments = mixer.cycle(PER_PAGE * 2 + 1).blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+    Comment.objects.filter(
+        pk__in=[comment.pk for comment in comments[:PER_PAGE + 1]]
+    ).update(created_at=same_time)
+    return list(
+        Comment.objects.filter(post=post_with_published_location)
+        .order_by("created_at", "pk")
+    )
+
+
+@pytest.fixture
+def per_page(monkeypatch):
+    monkeypatch.setattr(
+        "core.mixins.CommentPageMixin.comments_per_page", PER_PAGE
+    )
+
+
+def test_comments_are_loaded_page_by_page(
+        client, post_with_published_location, many_comments, per_page
+):
+    post = post_with_published_location
+    response = client.get(f"/posts/{post.id}/")
+    page = response.context["comments"]
+    assert [comment.id for comment in page] == [
+        comment.id for comment in many_comments[:PER_PAGE]
+    ], (
+        "Убедитесь, что на странице поста выводится только первая"
+        " страница комментариев."
+    )
+    assert f"/posts/{post.id}/comments/?cursor=" in response.content.decode()
+
+    seen = [comment.id for comment in page]
+    cursor = page.next_cursor
+    while cursor:
+        response = client.get(
+            f"/posts/{post.id}/comments/",
+            {"cursor": cursor, "format": "json"},
+        )
+        data = response.json()
+        seen += [comment["id"] for comment in data["comments"]]
+        cursor = data["next"] and parse_qs(
+            urlsplit(data["next"]).query
+        )["cursor"][0]
+    assert seen == [comment.id for comment in many_comments], (
+        "Убедитесь, что подгрузка комментариев по курсору выдаёт все"
+        " комментарии по одному разу и по порядку."
+    )
+
+
+def test_comments_fragment(
+        client, post_with_published_location, many_comments, per_page
+):
+    post = post_with_published_location
+    first_page = client.get(f"/posts/{post.id}/").context["comments"]
+    response = client.get(
+        f"/posts/{post.id}/comments/", {"cursor": first_page.next_cursor}
+    )
+    content = response.content.decode()
+    assert response.status_code == 200
+    assert "<html" not in content, (
+        "Убедитесь, что следующая страница комментариев отдаётся"
+        " HTML-фрагментом, без обёртки страницы."
+    )
+    for comment in many_comments[PER_PAGE:PER_PAGE * 2]:
+        assert f'name="comment_{comment.id}"' in content
+    assert f'name="comment_{many_comments[0].id}"' not in content
+
+
+def test_comments_of_hidden_post_and_bad_cursor(
+        client, user_client, mixer, user, post_with_published_location
+):
+    hidden = mixer.blend("blog.Post", author=user, is_published=False)
+    assert client.get(f"/posts/{hidden.id}/comments/").status_code == 404
+    assert user_client.get(f"/posts/{hidden.id}/comments/").status_code == 200
+    response = client.get(
+        f"/posts/{post_with_published_location.id}/comments/",
+        {"cursor": "broken"},
+    )
+    assert response.status_code == 404
+
+
+def test_comment_thread_loads_only_author_name(
+        client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(f"/posts/{post.id}/comments/")
+    thread_queries = [
+        query["sql"] for query in ctx.captured_queries
+        if 'FROM "blog_comment"' in query["sql"]
+    ]
+    assert thread_queries and all(
+        '"auth_user"."password"' not in sql
+        and '"auth_user"."email"' not in sql
+        for sql in thread_queries
+    ), (
+        "Убедитесь, что для ветки комментариев из таблицы пользователей"
+        " загружаются только id и имя пользователя."
+    )
@@ -0,0 +1,141 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def revalidate(client, url, response):
+    with CaptureQueriesContext(connection) as ctx:
+        revalidated = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    return revalidated, ctx.captured_queries
+
+
+@pytest.fixture
+def post_urls(post_with_published_location):
+    post = post_with_published_location
+    return (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        f"/posts/{post.id}/",
+    )
+
+
+def test_unchanged_pages_return_not_modified(user_client, post_urls):
+    for url in post_urls:
+        response = user_client.get(url)
+        assert response.has_header("ETag"), (
+            f"Убедитесь, что страница `{url}` отдаёт заголовок ETag."
+        )
+        revalidated, queries = revalidate(user_client, url, response)
+        assert revalidated.status_code == 304, (
+            f"Убедитесь, что неизменившаяся страница `{url}` отвечает 304."
+        )
+        assert not any('"blog_comment"' in q["sql"] for q in queries), (
+            f"Убедитесь, что для ответа 304 на странице `{url}` не"
+            " выполняются запросы, нужные только шаблону."
+        )
+
+
+def test_validators_reuse_page_queries(user_client, post_urls):
+    for url in post_urls:
+        with CaptureQueriesContext(connection) as ctx:
+            response = user_client.get(url)
+        assert response.status_code == 200
+        sql = [query["sql"] for query in ctx.captured_queries]
+        assert len(sql) == len(set(sql)), (
+            f"Убедитесь, что на странице `{url}` валидаторы не повторяют"
+            " подсчёт и выборку страницы, которые затем выводит шаблон."
+        )
+        assert sum("COUNT(" in query for query in sql) <= 1
+
+
+def test_anonymous_cached_pages_return_not_modified(client, post_urls):
+    for url in post_urls:
+        response = client.get(url)
+        revalidated, queries = revalidate(client, url, response)
+        assert revalidated.status_code == 304
+        assert not queries
+
+
+def test_new_comment_changes_validators(
+        mixer, user_client, another_user, post_with_published_location,
+        post_urls
+):
+    responses = {url: user_client.get(url) for url in post_urls}
+    mixer.blend(
+        "blog.Comment", post=post_with_published_location,
+        author=another_user,
+    )
+    for url, response in responses.items():
+        revalidated, _ = revalidate(user_client, url, response)
+        assert revalidated.status_code == 200, (
+            f"Убедитесь, что после нового комментария страница `{url}`"
+            " отдаётся заново."
+        )
+
+
+def test_validators_depend_on_viewer(
+        user_client, another_user_client, post_urls
+):
+    response = user_client.get(post_urls[0])
+    revalidated, _ = revalidate(another_user_client, post_urls[0], response)
+    assert revalidated.status_code == 200, (
+        "Убедитесь, что ETag страницы различается для разных пользователей."
+    )
+
+
+def test_profile_change_changes_validators(
+        client, user_client, user, django_capture_on_commit_callbacks
+):
+    url = f"/profile/{user.username}/"
+    responses = [(c, c.get(url)) for c in (client, user_client)]
+    with django_capture_on_commit_callbacks(execute=True):
+        user.first_name = "Новое имя"
+        user.save()
+    for viewer, response in responses:
+        revalidated, _ = revalidate(viewer, url, response)
+        assert revalidated.status_code == 200, (
+            "Убедитесь, что после изменения данных пользователя страница"
+            " его профиля отдаётся заново."
+        )
+
+
+def test_feed_is_not_revalidated_by_date(
+        mixer, user_client, user, published_category,
+        django_capture_on_commit_callbacks
+):
+    posts = mixer.cycle(2).blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category,
+    )
+    response = user_client.get("/")
+    with django_capture_on_commit_callbacks(execute=True):
+        posts[0].delete()
+    revalidated = user_client.get(
+        "/", HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT"
+    )
+    assert revalidated.status_code == 200 and not response.has_header(
+        "Last-Modified"
+    ), (
+        "Убедитесь, что лента не отвечает 304 по одному заголовку"
+        " If-Modified-Since: удаление поста не меняет даты изменения"
+        " оставшихся постов."
+    )
+
+
+def test_commenter_rename_changes_post_validators(
+        mixer, user_client, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.blend("blog.Comment", post=post, author=another_user)
+    url = f"/posts/{post.id}/"
+    response = user_client.get(url)
+    another_user.username = "renamed-commenter"
+    another_user.save()
+    revalidated, _ = revalidate(user_client, url, response)
+    assert revalidated.status_code == 200, (
+        "Убедитесь, что после смены имени комментатора страница поста"
+        " отдаётся заново."
+    )
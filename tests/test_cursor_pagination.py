@@ -0,0 +1,73 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def cursor_pagination(settings):
+    settings.FEED_PAGINATION = "cursor"
+
+
+@pytest.fixture
+def many_posts(mixer, user, published_category):
+    same_time = timezone.now() - timedelta(days=1)
+    posts = mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category, pub_date=same_time,
+    )
+    return sorted(posts, key=lambda post: post.id, reverse=True)
+
+
+def page_ids(response):
+    return [post.id for post in response.context["page_obj"]]
+
+
+def get_cursor(response, name):
+    match = re.search(
+        r'href="\?cursor=([\w-]+)">\s*' + name, response.content.decode()
+    )
+    assert match, f"Убедитесь, что на странице есть ссылка «{name}»."
+    return match.group(1)
+
+
+def test_cursor_walks_feed_without_gaps(
+        cursor_pagination, client, many_posts
+):
+    seen = []
+    response = client.get("/")
+    seen.extend(page_ids(response))
+    while response.context["page_obj"].has_next():
+        cursor = get_cursor(response, "Старее")
+        response = client.get(f"/?cursor={cursor}")
+        seen.extend(page_ids(response))
+    assert seen == [post.id for post in many_posts], (
+        "Убедитесь, что переход по курсору «Старее» показывает все посты"
+        " ровно один раз в порядке «от новых к старым»."
+    )
+
+    cursor = get_cursor(response, "<< Новее")
+    response = client.get(f"/?cursor={cursor}")
+    expected = seen[-3 - N_PER_PAGE:-3]
+    assert page_ids(response) == expected, (
+        "Убедитесь, что ссылка «Новее» возвращает на предыдущую страницу."
+    )
+
+
+def test_cursor_mode_does_not_count(cursor_pagination, client, many_posts):
+    with CaptureQueriesContext(connection) as ctx:
+        client.get("/")
+    assert not any(
+        "COUNT(" in query["sql"] for query in ctx.captured_queries
+    ), "Убедитесь, что в режиме курсора не выполняется COUNT(*)."
+
+
+def test_broken_cursor_is_not_found(cursor_pagination, client):
+    assert client.get("/?cursor=bm9wZQ").status_code == 404
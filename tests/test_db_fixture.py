@@ -0,0 +1,17 @@
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+FIXTURE = Path(__file__).resolve().parent.parent / "blogicum" / "db.json"
+
+
+@pytest.mark.django_db
+def test_project_fixture_loads():
+    call_command("loaddata", FIXTURE, verbosity=0)
+    assert Post.objects.filter(updated_at__isnull=False).count() == 39, (
+        "Убедитесь, что фикстура `db.json` загружается командой"
+        " `loaddata`."
+    )
@@ -0,0 +1,40 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_is_shared_between_feeds(
+        user, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.text = "Исходный текст"
+    post.save()
+    user_client.get("/")
+
+    type(post).objects.filter(pk=post.pk).update(text="Текст без отметки")
+    profile = user_client.get(f"/profile/{post.author.username}/")
+    assert "Исходный текст" in profile.content.decode(), (
+        "Убедитесь, что отрисованная карточка поста переиспользуется"
+        " в других лентах."
+    )
+
+    post.text = "Отредактированный текст"
+    post.save()
+    assert "Отредактированный текст" in user_client.get("/").content.decode(), (
+        "Убедитесь, что изменение поста сбрасывает кэш его карточки."
+    )
+
+
+def test_unpublished_warning_is_not_cached(
+        user, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.author = user
+    post.save()
+    profile_url = f"/profile/{user.username}/"
+    user_client.get(profile_url)
+
+    type(post).objects.filter(pk=post.pk).update(is_published=False)
+    assert "Пост снят с публикации" in (
+        user_client.get(profile_url).content.decode()
+    ), "Убедитесь, что предупреждения для автора не попадают в кэш карточки."
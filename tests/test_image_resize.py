@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+from concurrent.futures import Future
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from blog import images
+from core.filecache import DiskCache
+from core.workers import SingleFlight
+
+
+@pytest.fixture
+def stored_image(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.IMAGE_RESIZE = {"CACHE_DIR": tmp_path / "cache"}
+    image_io = BytesIO()
+    Image.new("RGB", (1200, 800), color=(73, 109, 137)).save(
+        image_io, format="JPEG"
+    )
+    name = default_storage.save(
+        "post_images/photo.jpg", ContentFile(image_io.getvalue())
+    )
+    return default_storage.open(name)
+
+
+def test_resized_image_is_served_with_long_lived_headers(client, stored_image):
+    url = images.resized_url(stored_image, 300)
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response["Content-Type"] == "image/webp"
+    assert "immutable" in response["Cache-Control"]
+    assert "public" in response["Cache-Control"]
+    with Image.open(BytesIO(b"".join(response.streaming_content))) as image:
+        assert (image.format, image.size) == ("WEBP", (300, 200)), (
+            "Убедитесь, что изображение уменьшается до запрошенной ширины."
+        )
+
+
+def test_resized_image_rejects_unsigned_parameters(client, stored_image):
+    url = images.resized_url(stored_image, 300)
+    assert client.get(url.replace("/300.", "/301.")).status_code == 404, (
+        "Убедитесь, что изображение нельзя запросить с неподписанными"
+        " параметрами."
+    )
+
+
+def test_resized_image_is_offloaded_to_proxy(
+        client, settings, tmp_path, stored_image
+):
+    settings.MEDIA_SERVING = {"OFFLOAD": "x-accel-redirect"}
+    response = client.get(images.resized_url(stored_image, 300))
+    accel = response["X-Accel-Redirect"]
+    assert accel.startswith("/protected-resized/") and not response.content, (
+        "Убедитесь, что при передаче файлов прокси уменьшенное изображение"
+        " отдаёт веб-сервер из дискового кэша."
+    )
+    cached = tmp_path / "cache" / accel[len("/protected-resized/"):]
+    assert cached.is_file()
+    assert "immutable" in response["Cache-Control"]
+
+    settings.MEDIA_SERVING = {"OFFLOAD": "x-sendfile"}
+    response = client.get(images.resized_url(stored_image, 300))
+    assert response["X-Sendfile"] == str(cached)
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_size=250)
+    cache.set("aa01", b"x" * 100)
+    cache.set("aa02", b"x" * 100)
+    old = time.time() - 7200
+    os.utime(cache.path("aa01"), (old, old))
+    os.utime(cache.path("aa02"), (old + 1, old + 1))
+    assert cache.get("aa01") is not None
+
+    cache.set("aa03", b"x" * 100)
+
+    assert cache.get("aa02") is None, (
+        "Убедитесь, что из переполненного кэша удаляется файл,"
+        " к которому дольше всего не обращались."
+    )
+    assert cache.get("aa01") is not None and cache.get("aa03") is not None
+
+
+def test_single_flight_runs_concurrent_calls_once():
+    n_threads = 5
+    flight = SingleFlight()
+    calls = []
+    waiting = threading.Semaphore(0)
+
+    class CountingFuture(Future):
+        def result(self, timeout=None):
+            # Вызывается внутри do() у всех, кроме ведущего вызова.
+            waiting.release()
+            return super().result(timeout)
+
+    def slow():
+        calls.append(1)
+        # Ведущий вызов ждёт, пока остальные потоки войдут в do().
+        for _ in range(n_threads - 1):
+            assert waiting.acquire(timeout=10)
+        return "result"
+
+    results = []
+    errors = []
+
+    def run():
+        try:
+            results.append(flight.do("key", slow))
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=run) for _ in range(n_threads)]
+    with patch("core.workers.Future", CountingFuture):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+
+    assert not errors
+    assert results == ["result"] * n_threads
+    assert len(calls) == 1, (
+        "Убедитесь, что одновременные запросы одного варианта изображения"
+        " выполняют одно уменьшение."
+    )
@@ -0,0 +1,89 @@
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from blog.models import Post, PostImage
+from core.storage import is_hashed_name
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_PROCESSING = {"ASYNC": False}
+    return tmp_path
+
+
+def jpeg_bytes(color=(73, 109, 137)):
+    image_io = BytesIO()
+    Image.new("RGB", (100, 100), color=color).save(image_io, format="JPEG")
+    return image_io.getvalue()
+
+
+def ref_count(name):
+    return PostImage.objects.get(name=name).ref_count
+
+
+def test_identical_uploads_share_one_file(mixer, media_root):
+    first, second = (
+        mixer.blend("blog.Post", image=ContentFile(jpeg_bytes(), "a.JPG"))
+        for _ in range(2)
+    )
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые загрузки хранятся в одном файле."
+    )
+    name = first.image.name
+    assert is_hashed_name(name) and name.endswith(".jpg")
+    assert len(Path(name).parts) == 4, (
+        "Убедитесь, что файлы раскладываются по вложенным каталогам."
+    )
+    assert ref_count(name) == 2
+
+    first.image = ContentFile(jpeg_bytes((1, 2, 3)), "b.jpg")
+    first.save()
+    assert ref_count(name) == 1
+    assert ref_count(first.image.name) == 1
+
+    second.delete()
+    assert ref_count(name) == 0, (
+        "Убедитесь, что удаление поста уменьшает счётчик ссылок на файл."
+    )
+
+
+def test_rehash_post_images_moves_legacy_files(mixer, media_root):
+    legacy_names = [
+        default_storage.save(f"post_images/{name}.jpg", ContentFile(data))
+        for name, data in (
+            ("one", jpeg_bytes()), ("two", jpeg_bytes()),
+            ("three", jpeg_bytes((1, 2, 3))),
+        )
+    ]
+    posts = mixer.cycle(3).blend("blog.Post")
+    for post, name in zip(posts, legacy_names):
+        Post.objects.filter(pk=post.pk).update(image=name)
+        PostImage.objects.create(name=name, ref_count=1)
+
+    call_command("rehash_post_images", batch_size=2)
+
+    new_names = [
+        Post.objects.get(pk=post.pk).image.name for post in posts
+    ]
+    assert all(map(is_hashed_name, new_names)), (
+        "Убедитесь, что команда `rehash_post_images` переименовывает файлы"
+        " по хешу содержимого."
+    )
+    assert new_names[0] == new_names[1] != new_names[2]
+    assert ref_count(new_names[0]) == 2 and ref_count(new_names[2]) == 1
+    assert not PostImage.objects.filter(name__in=legacy_names).exists()
+    for name in legacy_names:
+        assert not (media_root / name).exists(), (
+            "Убедитесь, что старые файлы удаляются после переноса."
+        )
+    for name in set(new_names):
+        assert (media_root / name).exists()
@@ -0,0 +1,209 @@
+import re
+import threading
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+from blog.images import image_pool, make_renditions
+from blog.models import ImageStatus, Post
+
+pytestmark = [pytest.mark.django_db]
+
+ORIENTATION = 0x0112
+MAKE = 0x010F
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_PROCESSING = {"ASYNC": False}
+    return tmp_path
+
+
+def make_photo(size=(3000, 1500)):
+    exif = Image.Exif()
+    exif[ORIENTATION] = 6
+    exif[MAKE] = "Camera"
+    image_io = BytesIO()
+    Image.new("RGB", size, color=(73, 109, 137)).save(
+        image_io, format="JPEG", exif=exif
+    )
+    return ImageFile(image_io, name="photo.jpg")
+
+
+def test_renditions_are_built_on_save(
+        mixer, media_root, client, published_category,
+        django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        post = mixer.blend(
+            "blog.Post", is_published=True, category=published_category,
+            image=make_photo(),
+        )
+    original = Path(post.image.name)
+    for width in (640, 960, 1280):
+        path = media_root / original.parent / f"{width}w" / original.name
+        assert path.exists(), (
+            "Убедитесь, что при сохранении поста создаются уменьшенные"
+            " копии изображения."
+        )
+        with Image.open(path) as rendition:
+            assert rendition.size == (width, width * 2), (
+                "Убедитесь, что уменьшенные копии повёрнуты согласно EXIF"
+                " и сохраняют пропорции."
+            )
+            assert not rendition.getexif(), (
+                "Убедитесь, что из уменьшенных копий удалены метаданные."
+            )
+
+    content = client.get("/").content.decode("utf-8")
+    assert f"/640w/{original.name} 640w" in content, (
+        "Убедитесь, что в карточке поста указан атрибут `srcset`."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_renditions_are_built_off_request(
+        mixer, settings, media_root, client
+):
+    settings.IMAGE_PROCESSING = {"ASYNC": True}
+    post = mixer.blend("blog.Post", is_published=True, image=make_photo())
+    image_pool.wait(timeout=30)
+
+    post.refresh_from_db()
+    assert post.image_status == ImageStatus.READY, (
+        "Убедитесь, что после обработки изображения статус поста меняется"
+        " на «Готово»."
+    )
+    content = client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert "srcset" in content
+
+
+@pytest.mark.django_db(transaction=True)
+def test_identical_uploads_are_both_processed(mixer, settings, media_root):
+    settings.IMAGE_PROCESSING = {"ASYNC": True}
+    release = threading.Event()
+
+    def slow_renditions(*args):
+        release.wait(timeout=30)
+        return make_renditions(*args)
+
+    with patch("blog.signals.make_renditions", slow_renditions):
+        first, second = (
+            mixer.blend("blog.Post", image=make_photo((300, 200)))
+            for _ in range(2)
+        )
+        assert first.image.name == second.image.name
+        release.set()
+        image_pool.wait(timeout=30)
+
+    statuses = set(
+        Post.objects.filter(pk__in=(first.pk, second.pk))
+        .values_list("image_status", flat=True)
+    )
+    assert statuses == {ImageStatus.READY}, (
+        "Убедитесь, что изображение обрабатывается для каждого поста,"
+        " даже если одинаковые файлы загружены одновременно."
+    )
+
+
+def test_build_image_renditions_backfills(
+        mixer, media_root, client, published_category
+):
+    # Без коммита транзакции задача обработки не запускается.
+    post = mixer.blend(
+        "blog.Post", is_published=True, category=published_category,
+        pub_date=timezone.now(), image=make_photo((300, 200)),
+    )
+    assert post.image_status == ImageStatus.PENDING
+    content = client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert "srcset" not in content and post.image.url in content, (
+        "Убедитесь, что пока копии не готовы, показывается оригинал."
+    )
+
+    call_command("build_image_renditions", pending=True)
+
+    original = Path(post.image.name)
+    rendition = media_root / original.parent / "640w" / original.name
+    post.refresh_from_db()
+    assert rendition.exists() and post.has_renditions, (
+        "Убедитесь, что команда `build_image_renditions` создаёт"
+        " недостающие уменьшенные копии."
+    )
+    with Image.open(rendition) as image:
+        assert image.size == (200, 300), (
+            "Убедитесь, что изображения не увеличиваются."
+        )
+
+
+def test_image_dimensions_are_stored_with_orientation(
+        mixer, media_root, client, published_category
+):
+    post = mixer.blend(
+        "blog.Post", is_published=True, category=published_category,
+        pub_date=timezone.now(), image=make_photo((300, 200)),
+    )
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (200, 300), (
+        "Убедитесь, что размеры изображения сохраняются в БД с учётом"
+        " поворота из EXIF."
+    )
+
+    content = client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert 'width="200" height="300"' in content, (
+        "Убедитесь, что у изображения поста указаны атрибуты `width`"
+        " и `height`."
+    )
+
+    Post.objects.filter(pk=post.pk).update(image_width=None, image_height=None)
+    storage_class = type(Post._meta.get_field("image").storage)
+    with patch.object(storage_class, "open", side_effect=AssertionError):
+        Post.objects.get(pk=post.pk)
+        client.get(f"/posts/{post.id}/")
+
+    call_command("fill_image_dimensions")
+
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (200, 300), (
+        "Убедитесь, что команда `fill_image_dimensions` заполняет размеры"
+        " изображений."
+    )
+
+
+def test_cards_inline_placeholder_and_lazy_load_below_fold(
+        mixer, media_root, client, published_category,
+        django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        posts = mixer.cycle(3).blend(
+            "blog.Post", is_published=True, category=published_category,
+            pub_date=timezone.now(), image=make_photo((600, 400)),
+        )
+    post = Post.objects.get(pk=posts[0].pk)
+    assert post.image_placeholder.startswith("data:image/webp;base64,"), (
+        "Убедитесь, что для изображения поста сохраняется превью."
+    )
+    assert len(post.image_placeholder) < 1000
+
+    content = client.get("/").content.decode("utf-8")
+    images = [
+        tag for tag in re.findall(r"<img[^>]*>", content)
+        if "post_images/" in tag
+    ]
+    assert len(images) == 3
+    assert "loading=\"lazy\"" not in images[0], (
+        "Убедитесь, что изображение первой карточки загружается сразу."
+    )
+    assert all("loading=\"lazy\"" in image for image in images[1:]), (
+        "Убедитесь, что изображения карточек ниже первой загружаются"
+        " лениво."
+    )
+    assert all(post.image_placeholder in image for image in images), (
+        "Убедитесь, что превью изображения встроено в карточку поста."
+    )
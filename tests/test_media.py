@@ -0,0 +1,94 @@
+import pytest
+from django.core.files.base import ContentFile
+
+from core.storage import post_image_storage
+
+pytestmark = [pytest.mark.django_db]
+
+DATA = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def hashed_name(media_root):
+    return post_image_storage.save("post_images/a.png", ContentFile(DATA))
+
+
+def test_media_is_served_with_validators(client, hashed_name):
+    response = client.get(f"/{hashed_name}")
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == DATA
+    assert response["Content-Type"] == "image/png"
+    assert response["Accept-Ranges"] == "bytes"
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с хешем содержимого в имени отдаются"
+        " с заголовком Cache-Control: immutable."
+    )
+
+    not_modified = client.get(
+        f"/{hashed_name}", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert not_modified.status_code == 304, (
+        "Убедитесь, что на запрос с совпадающим If-None-Match"
+        " возвращается 304."
+    )
+    not_modified = client.get(
+        f"/{hashed_name}", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert not_modified.status_code == 304
+
+
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=0-99", 0, 99),
+    ("bytes=10000-", 10000, len(DATA) - 1),
+    ("bytes=-10", len(DATA) - 10, len(DATA) - 1),
+    ("bytes=100-999999", 100, len(DATA) - 1),
+])
+def test_range_requests(client, hashed_name, header, start, end):
+    response = client.get(f"/{hashed_name}", HTTP_RANGE=header)
+    assert response.status_code == 206, (
+        "Убедитесь, что на запрос с заголовком Range возвращается 206."
+    )
+    assert response["Content-Range"] == f"bytes {start}-{end}/{len(DATA)}"
+    assert b"".join(response.streaming_content) == DATA[start:end + 1]
+    assert int(response["Content-Length"]) == end - start + 1
+
+
+def test_unsatisfiable_and_stale_ranges(client, hashed_name):
+    response = client.get(f"/{hashed_name}", HTTP_RANGE="bytes=99999-")
+    assert response.status_code == 416
+    assert response["Content-Range"] == f"bytes */{len(DATA)}"
+
+    response = client.get(
+        f"/{hashed_name}", HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"'
+    )
+    assert response.status_code == 200, (
+        "Убедитесь, что при несовпадающем If-Range файл отдаётся целиком."
+    )
+
+
+def test_offload_to_proxy(client, settings, media_root, hashed_name):
+    settings.MEDIA_SERVING = {"OFFLOAD": "x-accel-redirect"}
+    response = client.get(f"/{hashed_name}")
+    assert response["X-Accel-Redirect"] == f"/protected-media/{hashed_name}"
+    assert response.content == b"", (
+        "Убедитесь, что при передаче файла прокси воркер не отдаёт"
+        " его содержимое сам."
+    )
+
+    settings.MEDIA_SERVING = {"OFFLOAD": "x-sendfile"}
+    response = client.get(f"/{hashed_name}")
+    assert response["X-Sendfile"] == str(media_root / hashed_name)
+
+
+def test_mutable_and_missing_files(client, media_root):
+    (media_root / "legacy.png").write_bytes(DATA)
+    response = client.get("/legacy.png")
+    assert "immutable" not in response["Cache-Control"]
+    assert client.get("/missing.png").status_code == 404
+    assert client.get("/../settings.py").status_code == 404
@@ -0,0 +1,92 @@
+import os
+import time
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import rendition_names
+from blog.models import PostImage
+from core.storage import post_image_storage
+
+pytestmark = [pytest.mark.django_db]
+
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.IMAGE_PROCESSING = {"ASYNC": False}
+    return tmp_path
+
+
+def gif_bytes(color):
+    image_io = BytesIO()
+    Image.new("RGB", (50, 50), color=color).save(image_io, format="GIF")
+    return image_io.getvalue()
+
+
+def age(media_root, seconds):
+    past = time.time() - seconds
+    for path in media_root.rglob("*"):
+        if path.is_file():
+            os.utime(path, (past, past))
+
+
+def test_orphaned_files_are_collected_after_grace_period(
+        mixer, media_root, django_capture_on_commit_callbacks
+):
+    with django_capture_on_commit_callbacks(execute=True):
+        kept, removed = (
+            mixer.blend("blog.Post", image=ContentFile(
+                gif_bytes(color), "photo.gif"
+            ))
+            for color in ((1, 2, 3), (4, 5, 6))
+        )
+    kept_files = [kept.image.name, *rendition_names(kept.image.name).values()]
+    removed_files = [
+        removed.image.name, *rendition_names(removed.image.name).values()
+    ]
+    removed.delete()
+    age(media_root, 2 * DAY)
+    fresh = post_image_storage.save(
+        "post_images/fresh.gif", ContentFile(gif_bytes((7, 8, 9)))
+    )
+
+    call_command("collect_orphaned_media", "--dry-run")
+    assert all((media_root / name).exists() for name in removed_files), (
+        "Убедитесь, что с ключом --dry-run файлы не удаляются."
+    )
+
+    call_command("collect_orphaned_media", batch_size=2)
+    assert not any((media_root / name).exists() for name in removed_files), (
+        "Убедитесь, что команда `collect_orphaned_media` удаляет файлы,"
+        " на которые не ссылается ни один пост, вместе с их копиями."
+    )
+    assert all((media_root / name).exists() for name in kept_files), (
+        "Убедитесь, что файлы, на которые ссылаются посты, не удаляются."
+    )
+    assert (media_root / fresh).exists(), (
+        "Убедитесь, что недавно изменённые файлы не удаляются."
+    )
+    assert not PostImage.objects.filter(name=removed.image.name).exists()
+
+
+def test_reupload_of_orphan_protects_it_from_collection(media_root):
+    name = post_image_storage.save(
+        "post_images/photo.gif", ContentFile(gif_bytes((1, 2, 3)))
+    )
+    age(media_root, 2 * DAY)
+
+    post_image_storage.save(
+        "post_images/again.gif", ContentFile(gif_bytes((1, 2, 3)))
+    )
+    call_command("collect_orphaned_media")
+
+    assert (media_root / name).exists(), (
+        "Убедитесь, что повторная загрузка того же файла продлевает"
+        " льготный период сборщика мусора."
+    )
@@ -0,0 +1,124 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def n_queries(client, url: str) -> int:
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(ctx.captured_queries)
+
+
+@pytest.fixture
+def two_posts(mixer, user, published_category, published_location):
+    return mixer.cycle(2).blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category, location=published_location,
+    )
+
+
+def test_anonymous_pages_are_served_from_cache(client, user, two_posts):
+    post = two_posts[0]
+    for url in (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{user.username}/",
+        f"/posts/{post.id}/",
+    ):
+        first = client.get(url).content
+        assert n_queries(client, url) == 0, (
+            f"Убедитесь, что страница `{url}` для анонимного посетителя"
+            " отдаётся из кэша без запросов к БД."
+        )
+        assert client.get(url).content == first
+
+
+def test_authenticated_pages_are_not_cached(user_client, two_posts):
+    user_client.get("/")
+    assert n_queries(user_client, "/") > 0, (
+        "Убедитесь, что страницы авторизованных пользователей не кэшируются."
+    )
+
+
+def test_comment_invalidates_only_related_pages(
+        mixer, client, another_user, two_posts,
+        django_capture_on_commit_callbacks
+):
+    commented, untouched = two_posts
+    urls = ("/", f"/posts/{commented.id}/", f"/posts/{untouched.id}/")
+    for url in urls:
+        client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend("blog.Comment", post=commented, author=another_user)
+
+    assert "Комментарии (1)" in client.get("/").content.decode(), (
+        "Убедитесь, что новый комментарий сбрасывает кэш ленты."
+    )
+    assert n_queries(client, f"/posts/{commented.id}/") > 0, (
+        "Убедитесь, что новый комментарий сбрасывает кэш страницы поста."
+    )
+    assert n_queries(client, f"/posts/{untouched.id}/") == 0, (
+        "Убедитесь, что комментарий к одному посту не сбрасывает кэш"
+        " страниц других постов."
+    )
+
+
+def test_category_change_invalidates_pages(
+        client, two_posts, django_capture_on_commit_callbacks
+):
+    post = two_posts[0]
+    client.get(f"/posts/{post.id}/")
+    with django_capture_on_commit_callbacks(execute=True):
+        post.category.title = "Новое название"
+        post.category.save()
+    assert "Новое название" in client.get(f"/posts/{post.id}/").content.decode()
+
+
+def test_pages_are_invalidated_after_commit(
+        mixer, client, another_user, two_posts,
+        django_capture_on_commit_callbacks
+):
+    post = two_posts[0]
+    url = f"/posts/{post.id}/"
+    client.get(url)
+    with django_capture_on_commit_callbacks() as callbacks:
+        mixer.blend("blog.Comment", post=post, author=another_user)
+        assert n_queries(client, url) == 0, (
+            "Убедитесь, что кэш страниц сбрасывается только после коммита"
+            " транзакции: до него читатель видит прежние данные."
+        )
+    for callback in callbacks:
+        callback()
+    assert n_queries(client, url) > 0
+
+
+def test_username_change_invalidates_comment_pages(
+        mixer, client, another_user, two_posts,
+        django_capture_on_commit_callbacks
+):
+    post = two_posts[0]
+    mixer.blend("blog.Comment", post=post, author=another_user)
+    url = f"/posts/{post.id}/"
+    client.get(url)
+    with django_capture_on_commit_callbacks(execute=True):
+        another_user.username = "renamed-commenter"
+        another_user.save()
+    assert "renamed-commenter" in client.get(url).content.decode(), (
+        "Убедитесь, что смена имени пользователя сбрасывает кэш страниц"
+        " с его комментариями."
+    )
+
+
+def test_production_page_cache_is_shared():
+    from blogicum import settings_production
+
+    alias = settings_production.PAGE_CACHE["ALIAS"]
+    backend = settings_production.CACHES[alias]["BACKEND"]
+    assert not backend.endswith("LocMemCache"), (
+        "Убедитесь, что в боевом профиле кэш страниц общий для всех"
+        " воркеров."
+    )
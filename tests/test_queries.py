@@ -0,0 +1,83 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_page_queries(client, url: str) -> int:
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f"Убедитесь, что страница `{url}` загружается без ошибок."
+    )
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.parametrize(
+    "url_template",
+    ("/", "/category/{category.slug}/", "/profile/{user.username}/"),
+    ids=["index", "category", "profile"],
+)
+def test_feed_query_budget_does_not_depend_on_page_size(
+        mixer, user, user_client, published_category, published_location,
+        url_template
+):
+    url = url_template.format(category=published_category, user=user)
+    mixer.blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category, location=published_location,
+    )
+    n_queries_one_post = count_page_queries(user_client, url)
+
+    mixer.cycle(N_PER_PAGE).blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category, location=published_location,
+    )
+    n_queries_full_page = count_page_queries(user_client, url)
+
+    assert n_queries_full_page == n_queries_one_post, (
+        f"Убедитесь, что число запросов к БД на странице `{url}` не зависит"
+        " от количества постов на странице."
+    )
+
+
+def count_table_reads(client, url: str, table: str) -> int:
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(url)
+    return sum(
+        f'FROM "{table}"' in query["sql"] for query in ctx.captured_queries
+    )
+
+
+def test_objects_are_resolved_once_per_request(
+        mixer, user, user_client, published_category,
+        post_with_published_location
+):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    for url, table in (
+        (f"/posts/{post.id}/", "blog_post"),
+        (f"/posts/{post.id}/edit/", "blog_post"),
+        (f"/posts/{post.id}/delete/", "blog_post"),
+        (f"/posts/{post.id}/edit_comment/{comment.id}/", "blog_comment"),
+        (f"/posts/{post.id}/delete_comment/{comment.id}/", "blog_comment"),
+        (f"/category/{published_category.slug}/", "blog_category"),
+    ):
+        assert count_table_reads(user_client, url, table) == 1, (
+            f"Убедитесь, что на странице `{url}` объект из таблицы"
+            f" `{table}` запрашивается из БД один раз."
+        )
+
+    with CaptureQueriesContext(connection) as ctx:
+        user_client.get(f"/profile/{user.username}/")
+    profile_lookups = [
+        query for query in ctx.captured_queries
+        if '"auth_user"."username" =' in query["sql"]
+    ]
+    assert len(profile_lookups) == 1, (
+        "Убедитесь, что на странице пользователя профиль запрашивается"
+        " из БД один раз."
+    )
@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from conftest import N_PER_PAGE
+from core.paginator import NEWER, OLDER, encode_cursor
+
+pytestmark = [pytest.mark.django_db]
+
+
+def explain(sql: str):
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def assert_pages_use_indexes(client, urls):
+    for url in urls:
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f"Убедитесь, что страница `{url}` загружается без ошибок."
+        )
+        for query in ctx.captured_queries:
+            if not query["sql"].startswith("SELECT"):
+                continue
+            for step in explain(query["sql"]):
+                assert not step.startswith("SCAN"), (
+                    f"Запрос страницы `{url}` читает таблицу целиком"
+                    f" ({step}):\n{query['sql']}"
+                )
+                assert "TEMP B-TREE" not in step, (
+                    f"Запрос страницы `{url}` сортирует строки без индекса"
+                    f" ({step}):\n{query['sql']}"
+                )
+
+
+@pytest.fixture
+def hot_urls(mixer, user, published_category, published_location):
+    posts = mixer.cycle(N_PER_PAGE + 1).blend(
+        "blog.Post", author=user, is_published=True,
+        category=published_category, location=published_location,
+    )
+    comments = mixer.cycle(3).blend(
+        "blog.Comment", post=posts[0], author=user
+    )
+    after_comment = encode_cursor(
+        NEWER, comments[0].created_at, comments[0].id
+    )
+    older = encode_cursor(OLDER, posts[5].pub_date, posts[5].id)
+    newer = encode_cursor(NEWER, posts[5].pub_date, posts[5].id)
+    return (
+        "/",
+        "/?page=2",
+        f"/category/{published_category.slug}/",
+        f"/category/{published_category.slug}/?page=2",
+        f"/?cursor={older}",
+        f"/?cursor={newer}",
+        f"/category/{published_category.slug}/?cursor={older}",
+        f"/profile/{user.username}/",
+        f"/posts/{posts[0].id}/",
+        f"/posts/{posts[0].id}/comments/?cursor={after_comment}",
+    )
+
+
+@pytest.mark.parametrize("pagination", ("numbered", "cursor"))
+def test_hot_queries_use_indexes(
+        settings, client, user_client, hot_urls, pagination
+):
+    settings.FEED_PAGINATION = pagination
+    assert_pages_use_indexes(client, hot_urls)
+    assert_pages_use_indexes(user_client, hot_urls)
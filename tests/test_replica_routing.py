@@ -0,0 +1,124 @@
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from core.routers import ReplicaRouter, replica_routing_settings
+
+pytestmark = pytest.mark.django_db(
+    transaction=True, databases=["default", "replica"]
+)
+
+
+@pytest.fixture(autouse=True)
+def replica_routing(settings):
+    settings.REPLICA_ROUTING = {"ENABLED": True}
+    settings.PAGE_CACHE = {"ENABLED": False}
+
+
+def get_counting(client, url):
+    with CaptureQueriesContext(connections["replica"]) as replica, \
+            CaptureQueriesContext(connections["default"]) as default:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(replica), [
+        query["sql"] for query in default
+        if "django_session" not in query["sql"]
+    ]
+
+
+def test_read_only_views_read_from_replica(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    for url in (
+        "/",
+        f"/posts/{post.id}/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+        "/pages/about/",
+        "/pages/rules/",
+    ):
+        n_replica, default = get_counting(user_client, url)
+        assert n_replica and not default, (
+            f"Убедитесь, что страница `{url}` читает данные из реплики."
+        )
+
+    n_replica, _ = get_counting(user_client, "/search/?q=Текст")
+    assert not n_replica, (
+        "Убедитесь, что реплика используется только для view"
+        " с ReplicaReadMixin."
+    )
+
+
+def test_author_reads_own_writes_from_default(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    response = user_client.post(
+        f"/posts/{post.id}/comment/", data={"text": "Текст"}
+    )
+    assert response.status_code == 302
+    n_replica, default = get_counting(user_client, f"/posts/{post.id}/")
+    assert not n_replica and default, (
+        "Убедитесь, что сразу после своей записи пользователь читает"
+        " данные из основной базы."
+    )
+
+    session = user_client.session
+    key = replica_routing_settings()["SESSION_KEY"]
+    session[key] -= replica_routing_settings()["READ_YOUR_WRITES_SECONDS"]
+    session.save()
+    n_replica, _ = get_counting(user_client, f"/posts/{post.id}/")
+    assert n_replica, (
+        "Убедитесь, что отметка о записи в сессии действует недолго."
+    )
+
+
+def test_writes_go_to_default(post_with_published_location):
+    post = post_with_published_location
+    post._state.db = "replica"
+    router = ReplicaRouter()
+    assert router.db_for_write(type(post), instance=post) == "default"
+    assert router.allow_migrate("replica", "blog") is False
+    assert router.db_for_read(type(post)) is None, (
+        "Убедитесь, что вне view только для чтения запросы идут"
+        " в основную базу."
+    )
+
+
+def test_routing_disabled_by_default(
+        settings, user_client, post_with_published_location
+):
+    settings.REPLICA_ROUTING = {}
+    n_replica, _ = get_counting(user_client, "/")
+    assert not n_replica
+
+    with CaptureQueriesContext(connections["default"]) as ctx:
+        user_client.post(
+            f"/posts/{post_with_published_location.id}/comment/",
+            data={"text": "Текст"},
+        )
+    assert not [
+        query for query in ctx.captured_queries
+        if query["sql"].startswith('UPDATE "django_session"')
+    ], (
+        "Убедитесь, что без реплики запись не отмечается в сессии."
+    )
+
+
+def test_cached_pages_are_rendered_from_default(
+        settings, client, user_client, post_with_published_location
+):
+    settings.PAGE_CACHE = {"TIMEOUTS": {"post": 300}}
+    url = f"/posts/{post_with_published_location.id}/"
+    n_replica, default = get_counting(client, url)
+    assert not n_replica and default, (
+        "Убедитесь, что страница, которая сохраняется в кэш страниц,"
+        " рендерится из основной базы, а не из отстающей реплики."
+    )
+    assert get_counting(client, url) == (0, [])
+
+    n_replica, _ = get_counting(user_client, url)
+    assert n_replica, (
+        "Убедитесь, что страницы вне кэша по-прежнему читаются из реплики."
+    )
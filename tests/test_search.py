@@ -0,0 +1,58 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def russian_posts(mixer, user, published_category):
+    def blend(title, text, is_published=True):
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            is_published=is_published, title=title, text=text,
+        )
+
+    return {
+        "moscow": blend("Прогулка", "Вечером гуляли по Москве и пили чай."),
+        "title": blend("Москва зимой", "Короткая заметка."),
+        "hidden": blend(
+            "Москва", "Черновик о Москве.", is_published=False
+        ),
+        "other": blend("Питер", "Белые ночи и разводные мосты."),
+    }
+
+
+def search_ids(client, query):
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == 200, (
+        "Убедитесь, что страница поиска `/search/` загружается без ошибок."
+    )
+    return [post.id for post in response.context["page_obj"]], response
+
+
+def test_search_handles_russian_word_forms(client, russian_posts):
+    ids, response = search_ids(client, "москва")
+    assert set(ids) == {russian_posts["moscow"].id, russian_posts["title"].id}, (
+        "Убедитесь, что поиск находит разные формы русских слов и не"
+        " показывает неопубликованные посты."
+    )
+    assert ids[0] == russian_posts["title"].id, (
+        "Убедитесь, что совпадение в заголовке ранжируется выше."
+    )
+    assert "<mark>Москве</mark>" in response.content.decode(), (
+        "Убедитесь, что найденные слова выделяются во фрагменте текста."
+    )
+
+
+def test_search_index_follows_post_changes(client, russian_posts):
+    post = russian_posts["other"]
+    post.text = "Теперь тут про Москву."
+    post.save()
+    assert post.id in search_ids(client, "Москвы")[0]
+
+    post.delete()
+    assert post.id not in search_ids(client, "Москвы")[0]
+
+
+def test_search_ignores_fts_syntax(client, russian_posts):
+    for query in ('"', "NEAR(", "title:*", "-", ""):
+        search_ids(client, query)
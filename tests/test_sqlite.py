@@ -0,0 +1,43 @@
+import pytest
+from django.db import connection
+
+from core.db import configure_sqlite
+
+pytestmark = [pytest.mark.django_db]
+
+
+def pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_connection_gets_configured_pragmas(settings):
+    settings.SQLITE_PRAGMAS = {
+        "synchronous": "off",
+        "busy_timeout": 1234,
+        "cache_size": None,
+        "temp_store": None,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA cache_size = -4321")
+    configure_sqlite(sender=None, connection=connection)
+    assert (pragma("synchronous"), pragma("busy_timeout")) == (0, 1234), (
+        "Убедитесь, что PRAGMA из настройки SQLITE_PRAGMAS применяются"
+        " к соединению с SQLite."
+    )
+    assert pragma("cache_size") == -4321, (
+        "Убедитесь, что PRAGMA со значением None не выполняется."
+    )
+    settings.SQLITE_PRAGMAS = {}
+    configure_sqlite(sender=None, connection=connection)
+
+
+def test_default_connection_is_tuned():
+    assert pragma("synchronous") == 1
+    assert pragma("temp_store") == 2
+    assert pragma("busy_timeout") == 5000, (
+        "Убедитесь, что при подключении к SQLite выставляются PRAGMA"
+        " из SQLITE_PRAGMAS."
+    )
@@ -0,0 +1,77 @@
+import os
+from io import BytesIO
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image
+
+from blog.models import Post
+from core.uploads import LimitedImageField
+
+pytestmark = [pytest.mark.django_db]
+
+
+def png_bytes(size):
+    image_io = BytesIO()
+    Image.new("RGB", size).save(image_io, format="PNG")
+    return image_io.getvalue()
+
+
+def noise_jpeg_bytes(size):
+    image_io = BytesIO()
+    Image.effect_noise(size, 64).save(image_io, format="JPEG", quality=95)
+    return image_io.getvalue()
+
+
+def test_oversized_upload_is_rejected_and_not_kept(
+        settings, tmp_path, user_client, published_category
+):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.FILE_UPLOAD_TEMP_DIR = tmp_path
+    settings.UPLOAD_LIMITS = {"MAX_FILE_SIZE": 64 * 1024}
+    photo = noise_jpeg_bytes((600, 600))
+    assert len(photo) > 128 * 1024
+
+    response = user_client.post(reverse("blog:create_post"), data={
+        "title": "Заголовок",
+        "text": "Текст",
+        "pub_date": "01/01/2020",
+        "category": published_category.id,
+        "is_published": True,
+        "image": SimpleUploadedFile("photo.jpg", photo, "image/jpeg"),
+    })
+
+    assert response.status_code == 200
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что изображение больше UPLOAD_LIMITS['MAX_FILE_SIZE']"
+        " отклоняется формой поста."
+    )
+    assert not Post.objects.exists()
+    assert not [path for path in os.listdir(tmp_path) if path != "media"], (
+        "Убедитесь, что временный файл отклонённой загрузки удаляется."
+    )
+
+
+def test_too_many_pixels_rejected_before_decoding(settings):
+    settings.UPLOAD_LIMITS = {"MAX_IMAGE_PIXELS": 100 * 100 - 1}
+    upload = SimpleUploadedFile("photo.png", png_bytes((100, 100)))
+    with patch.object(
+        Image.Image, "load", side_effect=AssertionError("декодирование")
+    ), patch.object(
+        Image.Image, "verify", side_effect=AssertionError("проверка")
+    ), pytest.raises(ValidationError) as error:
+        LimitedImageField().clean(upload)
+    assert error.value.code == "too_many_pixels", (
+        "Убедитесь, что изображение с числом пикселей больше"
+        " UPLOAD_LIMITS['MAX_IMAGE_PIXELS'] отклоняется по заголовку,"
+        " без декодирования."
+    )
+
+
+def test_image_within_limits_is_accepted(settings):
+    settings.UPLOAD_LIMITS = {"MAX_IMAGE_PIXELS": 100 * 100}
+    upload = SimpleUploadedFile("photo.png", png_bytes((100, 100)))
+    assert LimitedImageField().clean(upload).image.size == (100, 100)
@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+from django.db import OperationalError, connections
+from django.db.models.signals import pre_save
+
+from blog.models import Comment
+from core.db import WriteCoordinator, write_coordinator
+
+
+@pytest.fixture
+def fast_retries(settings):
+    settings.WRITE_COORDINATOR = {
+        "ENABLED": True, "DEADLINE": 1.0, "BASE_DELAY": 0.001,
+        "MAX_DELAY": 0.005,
+    }
+
+
+def flaky(n_failures, message="database is locked"):
+    calls = []
+
+    def write():
+        calls.append(1)
+        if len(calls) <= n_failures:
+            raise OperationalError(message)
+        return "ok"
+
+    return write, calls
+
+
+@pytest.mark.django_db(transaction=True)
+def test_locked_writes_are_retried(fast_retries):
+    coordinator = WriteCoordinator()
+    write, calls = flaky(2)
+    assert coordinator.run(write) == "ok"
+    stats = coordinator.stats()
+    assert (len(calls), stats["retries"], stats["writes"]) == (3, 2, 1), (
+        "Убедитесь, что запись, отклонённая из-за блокировки БД,"
+        " повторяется."
+    )
+
+    write, calls = flaky(1, "no such table: blog_post")
+    with pytest.raises(OperationalError):
+        coordinator.run(write)
+    assert len(calls) == 1, (
+        "Убедитесь, что ошибки, не связанные с блокировкой,"
+        " не повторяются."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_retries_stop_at_deadline(settings):
+    settings.WRITE_COORDINATOR = {
+        "DEADLINE": 0.1, "BASE_DELAY": 0.01, "MAX_DELAY": 0.02,
+    }
+    coordinator = WriteCoordinator()
+    write, _ = flaky(10 ** 6)
+    started = time.monotonic()
+    with pytest.raises(OperationalError):
+        coordinator.run(write)
+    assert time.monotonic() - started < 0.5
+    assert coordinator.stats()["timeouts"] == 1, (
+        "Убедитесь, что повторы записи прекращаются по истечении DEADLINE."
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_writes_in_process_are_serialized(fast_retries):
+    coordinator = WriteCoordinator()
+    active = []
+    overlaps = []
+
+    def write():
+        active.append(1)
+        overlaps.append(len(active))
+        time.sleep(0.01)
+        active.pop()
+
+    def worker():
+        try:
+            coordinator.run(write)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(overlaps) == 1, (
+        "Убедитесь, что записи внутри процесса выполняются по одной."
+    )
+    assert coordinator.stats()["queue_wait"] > 0
+
+
+@pytest.mark.django_db
+def test_views_write_through_coordinator(
+        settings, user_client, post_with_published_location
+):
+    settings.WRITE_COORDINATOR = {"ENABLED": True}
+    writes = write_coordinator.stats().get("writes", 0)
+    response = user_client.post(
+        f"/posts/{post_with_published_location.id}/comment/",
+        data={"text": "Текст"},
+    )
+    assert response.status_code == 302
+    assert write_coordinator.stats()["writes"] == writes + 1, (
+        "Убедитесь, что при включённом WRITE_COORDINATOR комментарий"
+        " записывается через координатор записи."
+    )
+
+
+@pytest.mark.parametrize("enabled", (False, True))
+@pytest.mark.django_db(transaction=True)
+def test_comment_on_post_deleted_mid_request(
+        settings, enabled, user_client, post_with_published_location
+):
+    settings.WRITE_COORDINATOR = {"ENABLED": enabled}
+    post = post_with_published_location
+
+    def delete_post(sender, instance, **kwargs):
+        type(post).objects.filter(pk=post.pk).delete()
+
+    pre_save.connect(delete_post, sender=Comment)
+    try:
+        response = user_client.post(
+            f"/posts/{post.id}/comment/", data={"text": "Текст"}
+        )
+    finally:
+        pre_save.disconnect(delete_post, sender=Comment)
+    assert response.status_code == 404, (
+        "Убедитесь, что комментарий к посту, удалённому во время запроса,"
+        " возвращает 404 и с координатором записи."
+    )